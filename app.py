@@ -1,20 +1,47 @@
+import base64
+import binascii
+import hashlib
 import json
+import multiprocessing
 import os
 import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
 from typing import Optional, List
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort
+import click
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, Response, stream_with_context
+from flask.cli import AppGroup
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import ForeignKey, Integer, String, DateTime, select, Text, Boolean, Float, func
-from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship, joinedload
-from datetime import datetime, timezone
+from sqlalchemy import ForeignKey, Integer, String, DateTime, select, Text, Boolean, Float, func, or_, update, insert, Index, UniqueConstraint, event, false, text, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship, joinedload, selectinload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import inspect as sa_inspect
+from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
+from markupsafe import Markup
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin, login_user, current_user, LoginManager, login_required, logout_user
 from flask_bootstrap import Bootstrap5
 from forms import CompleteCompanyProfile, CompleteUserProfile
+from matching import JobFeatures, score_jobs, shortlist, location_tokens, estimate_tokens, split_skills, canonical_skill
+from cache import TTLCache
+from search import ensure_search_index, search_job_ids
+from explain import explain
+from querycount import route_query_budget
+from instrumentation import init_request_timing, timed
+from metrics import init_metrics, init_worker_metrics, observe_recommendation, record_json_parse_failure, record_llm_usage
+from importer import iter_rows, iter_ndjson, chunked, hash_password
+from exporter import iter_csv, iter_xlsx
+from conditional import init_conditional_get, latest, not_modified
+from assets import init_assets, build_assets
+from llm import create_message, stream_text
+from jsonstream import ArrayItemParser
+from fragments import FragmentCache, FileFragmentStore
 # from openai import OpenAI
-import anthropic
-from flask_migrate import Migrate
+from flask_migrate import Migrate, stamp
 
 app = Flask(__name__)
 
@@ -22,6 +49,64 @@ load_dotenv()
 
 app.secret_key = os.environ.get("SECRET_KEY")
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DB_URI")
+# "llm" asks Claude to score every job, "local" scores in-process with matching.score_jobs
+app.config["RECOMMENDATION_ENGINE"] = os.environ.get("RECOMMENDATION_ENGINE", "llm")
+# Only used by the local engine: ask Claude to write the match reasons for the final picks
+app.config["RECOMMENDATION_EXPLAIN"] = os.environ.get("RECOMMENDATION_EXPLAIN", "false").lower() == "true"
+# Pre-filter: at most this many jobs are loaded from the DB, and only the best K go into the prompt
+app.config["RECOMMENDATION_CANDIDATE_POOL"] = int(os.environ.get("RECOMMENDATION_CANDIDATE_POOL", 500))
+app.config["RECOMMENDATION_SHORTLIST_SIZE"] = int(os.environ.get("RECOMMENDATION_SHORTLIST_SIZE", 25))
+app.config["RECOMMENDATION_MAX_JOB_AGE_DAYS"] = int(os.environ.get("RECOMMENDATION_MAX_JOB_AGE_DAYS", 90))
+app.config["RECOMMENDATION_PROMPT_TOKEN_BUDGET"] = int(os.environ.get("RECOMMENDATION_PROMPT_TOKEN_BUDGET", 6000))
+# Size of the shared job catalogue block that every user's prompt starts with (cached by the provider)
+app.config["RECOMMENDATION_CATALOGUE_TOKEN_BUDGET"] = int(os.environ.get("RECOMMENDATION_CATALOGUE_TOKEN_BUDGET", 20000))
+app.config["RECOMMENDATION_MAX_TOKENS"] = int(os.environ.get("RECOMMENDATION_MAX_TOKENS", 1024))
+# Recommendations are generated off the request path by `flask recommendations worker`.
+# For local runs without a worker process, drain the queue in a background thread instead.
+app.config["RECOMMENDATION_INLINE_WORKER"] = os.environ.get("RECOMMENDATION_INLINE_WORKER", "false").lower() == "true"
+# Running tasks older than this are assumed to belong to a dead worker and are picked up again
+app.config["RECOMMENDATION_TASK_TIMEOUT"] = int(os.environ.get("RECOMMENDATION_TASK_TIMEOUT", 300))
+# Identical profile + job catalogue inputs reuse the last results for this long (seconds)
+app.config["RECOMMENDATION_CACHE_TTL"] = int(os.environ.get("RECOMMENDATION_CACHE_TTL", 3600))
+app.config["RECOMMENDATION_CACHE_SIZE"] = int(os.environ.get("RECOMMENDATION_CACHE_SIZE", 256))
+# How often the dashboard's event stream checks for newly stored recommendations (seconds)
+app.config["RECOMMENDATION_STREAM_POLL_INTERVAL"] = float(os.environ.get("RECOMMENDATION_STREAM_POLL_INTERVAL", 0.5))
+# Each stream closes after this long and the browser reconnects, so it never runs into gunicorn's worker timeout
+app.config["RECOMMENDATION_STREAM_MAX_SECONDS"] = float(os.environ.get("RECOMMENDATION_STREAM_MAX_SECONDS", 20))
+# New jobs and users per batch when the worker merges new jobs into stored recommendations
+app.config["RECOMMENDATION_RESCORE_BATCH_SIZE"] = int(os.environ.get("RECOMMENDATION_RESCORE_BATCH_SIZE", 500))
+# Jobs per page on the dashboard and /api/jobs
+app.config["JOBS_PAGE_SIZE"] = int(os.environ.get("JOBS_PAGE_SIZE", 20))
+app.config["JOBS_PAGE_SIZE_MAX"] = int(os.environ.get("JOBS_PAGE_SIZE_MAX", 100))
+# Raise when a view runs more queries than its declared budget (for development and tests)
+app.config["QUERY_BUDGET_ENFORCE"] = os.environ.get("QUERY_BUDGET_ENFORCE", "false").lower() == "true"
+# Per-request DB/LLM/render timing in a Server-Timing header and a JSON log line
+app.config["REQUEST_TIMING"] = os.environ.get("REQUEST_TIMING", "false").lower() == "true"
+# Prometheus metrics at /metrics, optionally protected by a bearer token
+app.config["METRICS_ENABLED"] = os.environ.get("METRICS_ENABLED", "false").lower() == "true"
+app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN")
+# The recommendation worker serves no routes: scrape it on this port, or have it push to a Pushgateway
+app.config["METRICS_WORKER_PORT"] = int(os.environ.get("METRICS_WORKER_PORT", 0))
+app.config["METRICS_PUSHGATEWAY"] = os.environ.get("METRICS_PUSHGATEWAY")
+# Logged-in User + UserProfile kept in memory per worker process
+app.config["IDENTITY_CACHE_TTL"] = int(os.environ.get("IDENTITY_CACHE_TTL", 300))
+app.config["IDENTITY_CACHE_SIZE"] = int(os.environ.get("IDENTITY_CACHE_SIZE", 1024))
+# Anthropic client shared per process: per-attempt timeout, overall deadline and retry count (seconds)
+app.config["ANTHROPIC_API_KEY"] = os.environ.get("ANTHROPIC_API_KEY")
+app.config["LLM_TIMEOUT"] = float(os.environ.get("LLM_TIMEOUT", 60))
+app.config["LLM_CONNECT_TIMEOUT"] = float(os.environ.get("LLM_CONNECT_TIMEOUT", 5))
+app.config["LLM_DEADLINE"] = float(os.environ.get("LLM_DEADLINE", 120))
+app.config["LLM_MAX_RETRIES"] = int(os.environ.get("LLM_MAX_RETRIES", 2))
+app.config["LLM_MAX_CONNECTIONS"] = int(os.environ.get("LLM_MAX_CONNECTIONS", 10))
+# /api/jobs/bulk: jobs per insert transaction and the longest NDJSON line accepted
+app.config["JOBS_BULK_BATCH_SIZE"] = int(os.environ.get("JOBS_BULK_BATCH_SIZE", 500))
+app.config["JOBS_BULK_MAX_LINE_BYTES"] = int(os.environ.get("JOBS_BULK_MAX_LINE_BYTES", 65536))
+# Rows fetched per round trip when streaming application exports
+app.config["EXPORT_BATCH_SIZE"] = int(os.environ.get("EXPORT_BATCH_SIZE", 1000))
+# Rendered job cards; set FRAGMENT_CACHE_DIR to share them between the processes on a host
+app.config["FRAGMENT_CACHE_SIZE"] = int(os.environ.get("FRAGMENT_CACHE_SIZE", 2048))
+app.config["FRAGMENT_CACHE_TTL"] = int(os.environ.get("FRAGMENT_CACHE_TTL", 86400))
+app.config["FRAGMENT_CACHE_DIR"] = os.environ.get("FRAGMENT_CACHE_DIR")
 bootstrap = Bootstrap5(app)
 
 login_manager = LoginManager()
@@ -63,6 +148,7 @@ class User(UserMixin, db.Model):
         back_populates="employer",
         cascade="all, delete-orphan"
     )
+    skills: Mapped[List["Skill"]] = relationship(secondary="user_skills", order_by="Skill.display_name")
 
 class UserProfile(UserMixin, db.Model):
     __tablename__ = "userprofiles"
@@ -96,6 +182,12 @@ class UserProfile(UserMixin, db.Model):
 
 class Job(db.Model):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index('ix_jobs_employer_id_created_at', 'employer_id', 'created_at'),
+        Index('ix_jobs_created_at_id', 'created_at', 'id'),
+        # Small: only jobs still waiting for rescore_new_jobs
+        Index('ix_jobs_unrescored', 'id', postgresql_where=text('NOT rescored'), sqlite_where=text('NOT rescored')),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     employer_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
@@ -110,6 +202,15 @@ class Job(db.Model):
     job_type: Mapped[str] = mapped_column(String(20), nullable=False)
     requirements: Mapped[str] = mapped_column(String(200), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    # Denormalised application counters, kept in step by apply_job and change_application_status
+    application_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    under_review_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    accepted_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    rejected_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    # False until rescore_new_jobs has merged the job into existing recommendations
+    rescored: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
+
     employer: Mapped["User"] = relationship(back_populates="posted_jobs")
 
     applications: Mapped[List["Application"]] = relationship(
@@ -120,10 +221,39 @@ class Job(db.Model):
         back_populates="job",
         cascade="all, delete-orphan"
     )
+    skills: Mapped[List["Skill"]] = relationship(secondary="job_skills", order_by="Skill.display_name")
+
+
+class Skill(db.Model):
+    __tablename__ = 'skills'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Canonical lowercase name used for lookups, display_name keeps the spelling first seen
+    name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+    display_name: Mapped[str] = mapped_column(String(100), nullable=False)
+
+
+class JobSkill(db.Model):
+    __tablename__ = 'job_skills'
+
+    job_id: Mapped[int] = mapped_column(ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True)
+    skill_id: Mapped[int] = mapped_column(ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True, index=True)
+
+
+class UserSkill(db.Model):
+    __tablename__ = 'user_skills'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    skill_id: Mapped[int] = mapped_column(ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True, index=True)
 
 
 class Application(db.Model):
     __tablename__ = 'applications'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'job_id', name='uq_applications_user_id_job_id'),
+        Index('ix_applications_user_id_applied_at', 'user_id', 'applied_at'),
+        Index('ix_applications_job_id_applied_at', 'job_id', 'applied_at'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
@@ -145,6 +275,9 @@ class Application(db.Model):
 
 class JobRecommendation(db.Model):
     __tablename__ = 'job_recommendations'
+    __table_args__ = (
+        Index('ix_job_recommendations_user_id_match_score', 'user_id', 'match_score'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'))
@@ -170,17 +303,212 @@ class JobRecommendation(db.Model):
     job: Mapped["Job"] = relationship(back_populates="recommendations")
 
 
+class RecommendationTask(db.Model):
+    __tablename__ = 'recommendation_tasks'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), index=True)
+    status: Mapped[str] = mapped_column(String(20), default='queued', server_default='queued', index=True)
+    message: Mapped[Optional[str]] = mapped_column(String(500))
+    recommendation_count: Mapped[int] = mapped_column(Integer, default=0)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    cache_key: Mapped[Optional[str]] = mapped_column(String(64))
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    started_at: Mapped[Optional[datetime]]
+    finished_at: Mapped[Optional[datetime]]
+
+
+class CatalogueVersion(db.Model):
+    __tablename__ = 'catalogue_versions'
+
+    # Single row, bumped whenever the set of jobs changes
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+
+# Application status -> Job counter column
+APPLICATION_STATUS_COUNTERS = {
+    'Under Review': 'under_review_count',
+    'Accepted': 'accepted_count',
+    'Rejected': 'rejected_count',
+}
+
+
+identity_cache = TTLCache(
+    maxsize=app.config["IDENTITY_CACHE_SIZE"],
+    ttl=app.config["IDENTITY_CACHE_TTL"]
+)
+
+
+def column_values(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in sa_inspect(type(obj)).column_attrs}
+
+
+def attach_cached(model, values):
+    # Rebuild a persistent instance from cached column values without querying
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return db.session.merge(obj, load=False)
+
+
+def invalidate_identity(user_id):
+    identity_cache.pop(int(user_id))
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    return db.get_or_404(User, user_id)
-
-with app.app_context():
-    db.create_all()
+    user_id = int(user_id)
+    cached = identity_cache.get(user_id)
+
+    if cached is None:
+        # User and profile in one round trip
+        user = db.first_or_404(select(User).options(joinedload(User.profile)).where(User.id == user_id))
+        # Only settled accounts are cached: completing a profile clears this process's cache
+        # alone, so other workers would keep serving the unfinished account until the TTL ran out
+        if user.profile is not None and user.verified:
+            identity_cache.set(user_id, {
+                "user": column_values(user),
+                "profile": column_values(user.profile),
+            })
+        return user
+
+    user = attach_cached(User, cached["user"])
+    profile = attach_cached(UserProfile, cached["profile"])
+    set_committed_value(user, "profile", profile)
+    set_committed_value(profile, "user", user)
+    return user
+
+if app.config["REQUEST_TIMING"]:
+    init_request_timing(app, db)
+
+if app.config["METRICS_ENABLED"]:
+    init_metrics(app, db)
+
+init_conditional_get(app)
+init_assets(app)
+
+
+def get_or_create_skills(text):
+    # Comma-separated skills -> Skill rows, creating any that are new
+    names = split_skills(text)
+    if not names:
+        return []
+
+    existing = {
+        skill.name: skill
+        for skill in db.session.execute(select(Skill).where(Skill.name.in_(names))).scalars()
+    }
+    skills = []
+    for name, display_name in names.items():
+        skill = existing.get(name)
+        if skill is None:
+            skill = Skill(name=name, display_name=display_name[:100])
+            db.session.add(skill)
+        skills.append(skill)
+    return skills
+
+
+def adjust_job_counters(job_id, status=None, delta=1, total=True):
+    # Increment in SQL so concurrent applications don't overwrite each other's counts
+    values = {}
+    if total:
+        values['application_count'] = Job.application_count + delta
+    column = APPLICATION_STATUS_COUNTERS.get(status)
+    if column:
+        values[column] = getattr(Job, column) + delta
+    if values:
+        db.session.execute(update(Job).where(Job.id == job_id).values(**values))
+
+
+def change_application_status(application, status):
+    # Only move the counters for a status change this call actually made: the UPDATE matches the
+    # status we read, so when two reviewers change the same application at once the second one
+    # re-reads the status the first one wrote instead of taking it off the old one again
+    while status != application.status:
+        now = datetime.now(timezone.utc)
+        result = db.session.execute(
+            update(Application)
+            .where(Application.id == application.id, Application.status == application.status)
+            .values(status=status, updated_at=now, reviewed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            adjust_job_counters(application.job_id, application.status, -1, total=False)
+            adjust_job_counters(application.job_id, status, 1, total=False)
+            for key, value in (('status', status), ('updated_at', now), ('reviewed_at', now)):
+                set_committed_value(application, key, value)
+            return
+        db.session.refresh(application, ['status'])
+
+
+def reconcile_job_counters():
+    # Recount every job's applications and repair the ones whose counters drifted
+    actual = {}
+    for job_id, status, count in db.session.execute(
+        select(Application.job_id, Application.status, func.count(Application.id))
+        .group_by(Application.job_id, Application.status)
+    ):
+        counters = actual.setdefault(job_id, dict.fromkeys(['application_count', *APPLICATION_STATUS_COUNTERS.values()], 0))
+        counters['application_count'] += count
+        if status in APPLICATION_STATUS_COUNTERS:
+            counters[APPLICATION_STATUS_COUNTERS[status]] += count
+
+    empty = dict.fromkeys(['application_count', *APPLICATION_STATUS_COUNTERS.values()], 0)
+    repairs = []
+    for job_id, *stored in db.session.execute(
+        select(Job.id, Job.application_count, Job.under_review_count, Job.accepted_count, Job.rejected_count)
+    ):
+        expected = actual.get(job_id, empty)
+        if stored != [expected['application_count'], expected['under_review_count'],
+                      expected['accepted_count'], expected['rejected_count']]:
+            repairs.append({'id': job_id, **expected})
+
+    if repairs:
+        db.session.execute(update(Job), repairs)
+    db.session.commit()
+    return len(repairs)
+
+
+def bulk_skill_ids(skill_texts):
+    # Canonical name -> Skill.id for every skill mentioned, inserting the new ones in one statement
+    names = {}
+    for text in skill_texts:
+        for name, display_name in split_skills(text).items():
+            names.setdefault(name, display_name[:100])
+    if not names:
+        return {}
+
+    ids = dict(db.session.execute(select(Skill.name, Skill.id).where(Skill.name.in_(names))).all())
+    missing = [{"name": name, "display_name": display_name} for name, display_name in names.items() if name not in ids]
+    if missing:
+        db.session.execute(insert(Skill), missing)
+        ids.update(db.session.execute(
+            select(Skill.name, Skill.id).where(Skill.name.in_([skill["name"] for skill in missing]))
+        ).all())
+    return ids
+
+
+def insert_jobs(jobs):
+    # Multi-row insert of job dicts and their skill links; the caller commits
+    job_ids = db.session.execute(insert(Job).returning(Job.id, sort_by_parameter_order=True), jobs).scalars().all()
+
+    skill_ids = bulk_skill_ids(job["skills_required"] for job in jobs)
+    job_skills = [
+        {"job_id": job_id, "skill_id": skill_ids[name]}
+        for job_id, job in zip(job_ids, jobs) for name in split_skills(job["skills_required"])
+    ]
+    if job_skills:
+        db.session.execute(insert(JobSkill), job_skills)
+
+    bump_catalogue_version()
+    return job_ids
 
 
 def complete_profile_registration(form):
     try:
-        user = db.session.execute(select(User).where(User.id == current_user.id)).scalar_one()
+        user = current_user
         user_role = user.role
 
         new_profile = UserProfile(
@@ -206,8 +534,10 @@ def complete_profile_registration(form):
         )
 
         db.session.add(new_profile)
+        user.skills = get_or_create_skills(new_profile.skills)
         user.verified = True
         db.session.commit()
+        invalidate_identity(user.id)
 
         return True, "Profile completed successfully!"
 
@@ -243,6 +573,1311 @@ def time_ago(timestamp):
 # Register the filter
 app.jinja_env.filters['timeago'] = time_ago
 
+def extract_json(response_text):
+    # Method 1: Check if it's already pure JSON
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        record_json_parse_failure("direct")
+
+    # Method 2: Extract JSON using regex (find content between { and })
+    json_match = re.search(r'\{[\s\S]*\}', response_text)
+    if json_match:
+        try:
+            return json.loads(json_match.group(0))
+        except json.JSONDecodeError:
+            record_json_parse_failure("regex")
+            print(f"Response text was: {response_text[:500]}")  # Print first 500 chars
+            raise
+
+    # Method 3: Try to find JSON in code blocks
+    code_block_match = re.search(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```', response_text)
+    if code_block_match:
+        return json.loads(code_block_match.group(1))
+
+    record_json_parse_failure("none")
+    raise ValueError("Could not extract valid JSON from response")
+
+
+def llm_params(prompt, system=None):
+    params = {
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": app.config["RECOMMENDATION_MAX_TOKENS"],
+        "messages": [{"role": "user", "content": prompt}],
+    }
+    if system:
+        params["system"] = system
+    return params
+
+
+def ask_claude(prompt, system=None):
+    # client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    with timed("llm"):
+        response = create_message(app.config, **llm_params(prompt, system))
+    record_llm_usage(response.usage)
+
+    # Extract response text
+    return response.content[0].text.strip()
+
+
+def stream_recommendations(prompt, on_recommendation, system=None):
+    # Hand each recommendation over as soon as its JSON object is complete in the stream
+    parser = ArrayItemParser("recommendations")
+    chunks = []
+    recommendations = []
+    for text in stream_text(app.config, on_usage=record_llm_usage, **llm_params(prompt, system)):
+        chunks.append(text)
+        for rec in parser.feed(text):
+            recommendations.append(rec)
+            on_recommendation(rec)
+
+    for _ in range(parser.errors):
+        record_json_parse_failure("stream")
+
+    if recommendations:
+        return {"recommendations": recommendations}
+
+    # Not the expected shape, fall back to parsing the whole response
+    recommendations_data = extract_json("".join(chunks).strip())
+    for rec in recommendations_data.get("recommendations", []):
+        on_recommendation(rec)
+    return recommendations_data
+
+
+def job_skill_names(job_filter):
+    # Canonical skill names per job from job_skills, for the jobs matching job_filter
+    names = {}
+    for job_id, name in db.session.execute(
+        select(JobSkill.job_id, Skill.name)
+        .join(Skill, Skill.id == JobSkill.skill_id)
+        .where(JobSkill.job_id.in_(select(Job.id).where(job_filter)))
+    ):
+        names.setdefault(job_id, set()).add(name)
+    return names
+
+
+def user_skill_names(user_ids):
+    names = {}
+    for user_id, name in db.session.execute(
+        select(UserSkill.user_id, Skill.name)
+        .join(Skill, Skill.id == UserSkill.skill_id)
+        .where(UserSkill.user_id.in_(user_ids))
+    ):
+        names.setdefault(user_id, set()).add(name)
+    return names
+
+
+def skill_features(user, jobs):
+    # Scoring inputs with the skills read from the join tables instead of re-parsing the strings
+    features = JobFeatures(jobs, job_skill_names(Job.id.in_([job.id for job in jobs])))
+    return features, user_skill_names([user.user_id]).get(user.user_id, set())
+
+
+def candidate_jobs(user):
+    # Cheap DB pre-filter: recent jobs sharing a skill or the location (or remote) with the user
+    pool = app.config["RECOMMENDATION_CANDIDATE_POOL"]
+    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=app.config["RECOMMENDATION_MAX_JOB_AGE_DAYS"])
+
+    # Skill overlap is an index join on job_skills/user_skills
+    user_skill_ids = select(UserSkill.skill_id).where(UserSkill.user_id == user.user_id)
+    filters = [Job.id.in_(select(JobSkill.job_id).where(JobSkill.skill_id.in_(user_skill_ids)))]
+    filters += [func.lower(Job.location).contains(token) for token in location_tokens(user.location) if len(token) > 2]
+    filters += [func.lower(Job.location).contains("remote"), func.lower(Job.job_type).contains("remote")]
+
+    jobs = db.session.execute(
+        select(Job)
+        .where(Job.created_at >= since, or_(*filters))
+        .order_by(Job.created_at.desc())
+        .limit(pool)
+    ).scalars().all()
+
+    # Top up with the newest jobs so a narrow profile still gets recommendations
+    if len(jobs) < pool:
+        seen = [job.id for job in jobs]
+        jobs += db.session.execute(
+            select(Job)
+            .where(Job.id.not_in(seen))
+            .order_by(Job.created_at.desc())
+            .limit(pool - len(jobs))
+        ).scalars().all()
+
+    return jobs
+
+
+def job_prompt_entry(job):
+    return {
+        'id': job.id,
+        'title': job.title,
+        'company': job.company,
+        'required_skills': job.skills_required,
+        'location': job.location,
+        'salary_range': job.salary_range,
+        'job_type': job.job_type,
+        'description': job.description
+    }
+
+
+def budget_jobs_list(jobs):
+    # Keep adding the best ranked jobs until the token budget is spent, so prompt size stays flat
+    budget = app.config["RECOMMENDATION_PROMPT_TOKEN_BUDGET"]
+    jobs_list = []
+    used = 0
+    for job in jobs:
+        entry = job_prompt_entry(job)
+        cost = estimate_tokens(json.dumps(entry, separators=(",", ":")))
+        if jobs_list and used + cost > budget:
+            break
+        jobs_list.append(entry)
+        used += cost
+    return jobs_list
+
+
+RECOMMENDATION_INSTRUCTIONS = """You match job seekers to jobs from the job catalogue below.
+
+For the user described in the next message, calculate match scores (0.0 to 1.0) for:
+- skill_match_score: How well user's skills match required skills
+- location_match_score: Location compatibility
+- experience_match_score: Experience level match
+- Overall match_score (weighted average)
+
+CRITICAL: Return ONLY valid JSON, no other text. Use this exact structure:
+
+{"recommendations": [{"job_id": 1, "match_score": 0.85, "skill_match_score": 0.9, "location_match_score": 1.0, "experience_match_score": 0.85, "match_reasons": {"skills": "Strong Python and JavaScript match", "location": "Same city"}, "missing_skills": {"required": ["Docker", "AWS"], "recommendation": "Consider learning cloud technologies"}}]}
+
+Recommend the top 5 best matching jobs, ordered by match_score (highest first).
+Return ONLY the JSON, nothing else."""
+
+# Column order of the rows in the catalogue snapshot
+CATALOGUE_FIELDS = ("id", "title", "company", "required_skills", "location", "salary_range", "job_type", "description")
+
+catalogue_snapshots = TTLCache(maxsize=2, ttl=app.config["RECOMMENDATION_CACHE_TTL"])
+
+
+def catalogue_snapshot():
+    """The recent job catalogue as one compact, deterministic prompt block, rebuilt only when jobs change.
+
+    Every user's prompt starts with the same text for a given catalogue version, so the
+    provider can cache it and only the per-user suffix is processed each time.
+    """
+    version = current_catalogue_version()
+    snapshot = catalogue_snapshots.get(version)
+    if snapshot is not None:
+        return snapshot
+
+    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=app.config["RECOMMENDATION_MAX_JOB_AGE_DAYS"])
+    budget = app.config["RECOMMENDATION_CATALOGUE_TOKEN_BUDGET"]
+    rows = []
+    used = 0
+    # Newest jobs first until the budget is spent, then listed by id so the text is stable
+    for job in db.session.execute(
+        select(Job.id, Job.title, Job.company, Job.skills_required, Job.location,
+               Job.salary_range, Job.job_type, Job.description)
+        .where(Job.created_at >= since)
+        .order_by(Job.created_at.desc(), Job.id.desc())
+    ):
+        row = [job.id, job.title, job.company, job.skills_required, job.location,
+               job.salary_range, job.job_type, job.description]
+        cost = estimate_tokens(json.dumps(row, separators=(",", ":")))
+        if rows and used + cost > budget:
+            break
+        rows.append(row)
+        used += cost
+    rows.sort(key=lambda row: row[0])
+
+    text = (
+        f"{RECOMMENDATION_INSTRUCTIONS}\n\n"
+        f"Job catalogue (version {version}), one row per job with these fields: {json.dumps(CATALOGUE_FIELDS)}\n"
+        + "\n".join(json.dumps(row, separators=(",", ":")) for row in rows)
+    )
+    snapshot = {"version": version, "text": text, "job_ids": {row[0] for row in rows}}
+    catalogue_snapshots.set(version, snapshot)
+    return snapshot
+
+
+def llm_recommendations(user, jobs, on_recommendation=None):
+    # Only the best locally ranked jobs are offered to Claude
+    features, user_skills = skill_features(user, jobs)
+    shortlisted = shortlist(user, features, app.config["RECOMMENDATION_SHORTLIST_SIZE"], user_skills=user_skills)
+    snapshot = catalogue_snapshot()
+
+    # Cacheable prefix: instructions + catalogue, identical for every user until the jobs change
+    system = [{"type": "text", "text": snapshot["text"], "cache_control": {"type": "ephemeral"}}]
+
+    # Shortlisted jobs that didn't fit in the snapshot are sent with this user's message instead
+    extra_jobs = budget_jobs_list([job for job in shortlisted if job.id not in snapshot["job_ids"]])
+    extra = f"\nThese jobs are not in the catalogue:\n{json.dumps(extra_jobs, separators=(',', ':'))}\n" if extra_jobs else ""
+
+    prompt = f"""User Profile:
+- Skills: {user.skills}
+- Location: {user.location or 'Not specified'}
+- Experience: {user.experience_years} years
+- Expected salary: {user.salary_range or 'Not specified'}
+{extra}
+Only consider these job ids, best local match first: {json.dumps([job.id for job in shortlisted])}"""
+
+    if on_recommendation is not None:
+        return stream_recommendations(prompt, on_recommendation, system)
+    return extract_json(ask_claude(prompt, system))
+
+
+def explain_recommendations(user, recommendations, jobs):
+    # Scores are already computed locally, Claude only writes the reasons for the final picks
+    jobs_by_id = {job.id: job for job in jobs}
+    picks = [
+        {
+            'job_id': rec['job_id'],
+            'title': jobs_by_id[rec['job_id']].title,
+            'required_skills': jobs_by_id[rec['job_id']].skills_required,
+            'location': jobs_by_id[rec['job_id']].location,
+            'match_score': rec['match_score'],
+            'missing_skills': rec['missing_skills'].get('required', []),
+        }
+        for rec in recommendations
+    ]
+
+    prompt = f"""
+                Explain why each of these jobs matches this user.
+
+                User Profile:
+                - Skills: {user.skills}
+                - Location: {user.location}
+                - Experience: {user.experience_years} years
+
+                Matched Jobs:
+                {json.dumps(picks)}
+
+                CRITICAL: Return ONLY valid JSON, no other text. Use this exact structure:
+
+                {{
+                    "explanations": [
+                        {{
+                            "job_id": 1,
+                            "match_reasons": {{"skills": "Strong Python and JavaScript match", "location": "Same city"}},
+                            "recommendation": "Consider learning cloud technologies"
+                        }}
+                    ]
+                }}
+                """
+
+    try:
+        explanations = extract_json(ask_claude(prompt)).get('explanations', [])
+    except Exception as e:
+        # The locally generated reasons are still valid, so keep them
+        print(f"Error explaining recommendations: {e}")
+        return recommendations
+
+    by_job = {item.get('job_id'): item for item in explanations if isinstance(item, dict)}
+    for rec in recommendations:
+        explanation = by_job.get(rec['job_id'])
+        if not explanation:
+            continue
+        if explanation.get('match_reasons'):
+            rec['match_reasons'] = explanation['match_reasons']
+        if explanation.get('recommendation') and rec['missing_skills']:
+            rec['missing_skills']['recommendation'] = explanation['recommendation']
+    return recommendations
+
+
+def local_recommendations(user, jobs, on_recommendation=None):
+    features, user_skills = skill_features(user, jobs)
+    recommendations = score_jobs(user, features, limit=RECOMMENDATION_TOP_N, user_skills=user_skills)
+    if app.config["RECOMMENDATION_EXPLAIN"] and recommendations:
+        recommendations = explain_recommendations(user, recommendations, jobs)
+    if on_recommendation is not None:
+        for rec in recommendations:
+            on_recommendation(rec)
+    return {"recommendations": recommendations}
+
+
+RECOMMENDATION_ENGINES = {
+    "llm": llm_recommendations,
+    "local": local_recommendations,
+}
+
+
+def generate_recommendations(user, jobs, on_recommendation=None):
+    """Run the configured engine; on_recommendation, if given, is called with each result as it is ready."""
+    engine = RECOMMENDATION_ENGINES.get(app.config["RECOMMENDATION_ENGINE"])
+    if engine is None:
+        raise ValueError(f"Unknown recommendation engine: {app.config['RECOMMENDATION_ENGINE']}")
+    return engine(user, jobs, on_recommendation)
+
+
+recommendation_cache = TTLCache(
+    maxsize=app.config["RECOMMENDATION_CACHE_SIZE"],
+    ttl=app.config["RECOMMENDATION_CACHE_TTL"]
+)
+
+# Recommendations kept per user
+RECOMMENDATION_TOP_N = 5
+
+# Profile fields that change what gets recommended
+RECOMMENDATION_PROFILE_FIELDS = (
+    "skills", "location", "experience_years", "salary_range",
+    "position_held", "area_of_specialization", "degree",
+)
+
+
+def current_catalogue_version():
+    version = db.session.execute(select(CatalogueVersion.version).where(CatalogueVersion.id == 1)).scalar()
+    return version or 0
+
+
+def catalogue_version_bump():
+    return (
+        update(CatalogueVersion)
+        .where(CatalogueVersion.id == 1)
+        .values(version=CatalogueVersion.version + 1, updated_at=datetime.now(timezone.utc))
+    )
+
+
+def bump_catalogue_version():
+    # Runs inside the caller's transaction so the bump commits together with the job change
+    updated = db.session.execute(catalogue_version_bump())
+    if updated.rowcount == 0:
+        db.session.add(CatalogueVersion(id=1, version=1))
+
+
+def recommendation_cache_key(profile, engine=None, catalogue_version=None):
+    inputs = {field: getattr(profile, field) for field in RECOMMENDATION_PROFILE_FIELDS}
+    inputs["engine"] = engine or app.config["RECOMMENDATION_ENGINE"]
+    inputs["catalogue_version"] = current_catalogue_version() if catalogue_version is None else catalogue_version
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def recommendations_up_to_date(task, cache_key):
+    # The user's stored rows already came from these exact inputs
+    if not task or task.status != 'done' or task.cache_key != cache_key or not task.recommendation_count:
+        return False
+    finished_at = task.finished_at.replace(tzinfo=timezone.utc) if task.finished_at.tzinfo is None else task.finished_at
+    return datetime.now(timezone.utc) - finished_at < timedelta(seconds=app.config["RECOMMENDATION_CACHE_TTL"])
+
+
+def recommendation_values(user_id, rec):
+    return {
+        "user_id": user_id,
+        "job_id": rec['job_id'],
+        "match_score": rec['match_score'],
+        "skill_match_score": rec.get('skill_match_score'),
+        "location_match_score": rec.get('location_match_score'),
+        "salary_match_score": rec.get('salary_match_score'),
+        "experience_match_score": rec.get('experience_match_score'),
+        "match_reasons": json.dumps(rec.get('match_reasons', {})),
+        "missing_skills": json.dumps(rec.get('missing_skills', {})),
+    }
+
+
+def save_recommendations(profile, recommendations_data):
+    # Validate response structure
+    if 'recommendations' not in recommendations_data:
+        raise ValueError("Response missing 'recommendations' key")
+
+    # Delete old recommendations
+    db.session.execute(
+        db.delete(JobRecommendation).where(JobRecommendation.user_id == profile.user_id)
+    )
+
+    # Save new recommendations
+    saved = set()
+    for rec in recommendations_data.get('recommendations', []):
+        # Validate required fields
+        if 'job_id' not in rec or 'match_score' not in rec or rec['job_id'] in saved:
+            print(f"Skipping invalid recommendation: {rec}")
+            continue
+
+        db.session.add(JobRecommendation(**recommendation_values(profile.user_id, rec)))
+        saved.add(rec['job_id'])
+
+    return len(saved)
+
+
+def latest_recommendation_task(user_id):
+    return db.session.execute(
+        select(RecommendationTask)
+        .where(RecommendationTask.user_id == user_id)
+        .order_by(RecommendationTask.id.desc())
+        .limit(1)
+    ).scalar()
+
+
+def latest_done_recommendation_task(user_id, exclude=None):
+    query = (
+        select(RecommendationTask)
+        .where(RecommendationTask.user_id == user_id, RecommendationTask.status == 'done')
+        .order_by(RecommendationTask.id.desc())
+        .limit(1)
+    )
+    if exclude is not None:
+        query = query.where(RecommendationTask.id != exclude)
+    return db.session.execute(query).scalar()
+
+
+def enqueue_recommendation_task(profile):
+    # Don't queue a second run while one is still pending for this user
+    task = latest_recommendation_task(profile.user_id)
+    if task and task.status in ('queued', 'running'):
+        return task
+
+    # Nothing changed since the last run, keep the stored recommendations
+    if recommendations_up_to_date(task, recommendation_cache_key(profile)):
+        return task
+
+    task = RecommendationTask(user_id=profile.user_id)
+    db.session.add(task)
+    db.session.commit()
+
+    start_inline_worker()
+    return task
+
+
+def start_inline_worker():
+    if app.config["RECOMMENDATION_INLINE_WORKER"]:
+        threading.Thread(target=recommendation_worker_loop, kwargs={"once": True}, daemon=True).start()
+
+
+def claim_recommendation_task():
+    # The conditional UPDATE makes the claim atomic on both SQLite and Postgres,
+    # so several worker processes can poll the same table without a broker
+    now = datetime.now(timezone.utc)
+    stale = now.replace(tzinfo=None) - timedelta(seconds=app.config["RECOMMENDATION_TASK_TIMEOUT"])
+    claimable = or_(
+        RecommendationTask.status == 'queued',
+        (RecommendationTask.status == 'running') & (RecommendationTask.started_at < stale)
+    )
+
+    while True:
+        task_id = db.session.execute(
+            select(RecommendationTask.id)
+            .where(claimable)
+            .order_by(RecommendationTask.id)
+            .limit(1)
+        ).scalar()
+        if task_id is None:
+            return None
+
+        claimed = db.session.execute(
+            update(RecommendationTask)
+            .where(RecommendationTask.id == task_id, claimable)
+            .values(status='running', started_at=now, attempts=RecommendationTask.attempts + 1)
+        )
+        db.session.commit()
+        if claimed.rowcount == 1:
+            return db.session.get(RecommendationTask, task_id)
+
+
+def finish_recommendation_task(task, status, message, count=0):
+    task.status = status
+    task.message = message
+    task.recommendation_count = count
+    task.finished_at = datetime.now(timezone.utc)
+    db.session.commit()
+
+
+def run_recommendation_task(task):
+    start = time.perf_counter()
+    try:
+        process_recommendation_task(task)
+    finally:
+        observe_recommendation(app.config["RECOMMENDATION_ENGINE"], task.status, time.perf_counter() - start)
+
+
+def process_recommendation_task(task):
+    profile = db.session.execute(
+        select(UserProfile).where(UserProfile.user_id == task.user_id)
+    ).scalar_one_or_none()
+
+    if not profile:
+        finish_recommendation_task(task, 'failed', "User profile not found")
+        return
+
+    try:
+        cache_key = recommendation_cache_key(profile)
+        task.cache_key = cache_key
+
+        if recommendations_up_to_date(latest_done_recommendation_task(profile.user_id, exclude=task.id), cache_key):
+            count = db.session.execute(
+                select(func.count(JobRecommendation.id)).where(JobRecommendation.user_id == profile.user_id)
+            ).scalar()
+            finish_recommendation_task(task, 'done', "Your recommendations are already up to date.", count)
+            return
+
+        recommendations_data = recommendation_cache.get(cache_key)
+        if recommendations_data is None:
+            # Generate new recommendations from a bounded candidate pool
+            jobs = candidate_jobs(profile)
+
+            if not jobs:
+                finish_recommendation_task(task, 'done', "No jobs available for recommendations")
+                return
+
+            user_id = task.user_id
+            job_ids = {job.id for job in jobs}
+            saved = set()
+            accepted = []
+
+            def persist(rec):
+                # Committed one at a time so the dashboard's event stream can show it straight away
+                if rec.get('job_id') not in job_ids or 'match_score' not in rec or rec['job_id'] in saved:
+                    print(f"Skipping invalid recommendation: {rec}")
+                    return
+                recommendation = JobRecommendation(**recommendation_values(user_id, rec))
+                db.session.add(recommendation)
+                if not saved:
+                    # Insert before deleting the previous run so new ids stay above the old ones (SQLite reuses them)
+                    db.session.flush()
+                    db.session.execute(
+                        db.delete(JobRecommendation)
+                        .where(JobRecommendation.user_id == user_id, JobRecommendation.id != recommendation.id)
+                    )
+                db.session.commit()
+                saved.add(rec['job_id'])
+                accepted.append(rec)
+
+            generate_recommendations(profile, jobs, on_recommendation=persist)
+            # Only what passed validation is cached, a cache hit is saved without the candidate check
+            recommendations_data = {'recommendations': accepted}
+            saved_count = len(saved)
+        else:
+            saved_count = save_recommendations(profile, recommendations_data)
+            db.session.commit()
+
+        if saved_count > 0:
+            recommendation_cache.set(cache_key, recommendations_data)
+
+        if saved_count > 0:
+            finish_recommendation_task(task, 'done', f"Generated {saved_count} job recommendations successfully!", saved_count)
+        else:
+            finish_recommendation_task(task, 'failed', "No valid recommendations were generated. Please try again.")
+
+    except json.JSONDecodeError as e:
+        db.session.rollback()
+        print(f"JSON Decode Error: {e}")
+        finish_recommendation_task(task, 'failed', "Error parsing AI response. Please try again.")
+    except ValueError as e:
+        db.session.rollback()
+        print(f"Value Error: {e}")
+        finish_recommendation_task(task, 'failed', "Invalid AI response format. Please try again.")
+    except Exception as e:
+        db.session.rollback()
+        print(f"Unexpected Error: {e}")
+        finish_recommendation_task(task, 'failed', f"Error generating recommendations: {str(e)}"[:500])
+
+
+def claim_new_jobs(limit):
+    # Flag jobs as taken with a conditional UPDATE so each is rescored by one worker. A flag rather than
+    # an id watermark, so a job whose id was assigned early but committed late isn't skipped.
+    pending = select(Job.id).where(~Job.rescored).order_by(Job.id).limit(limit)
+    job_ids = db.session.execute(
+        update(Job)
+        .where(Job.id.in_(pending), ~Job.rescored)
+        .values(rescored=True)
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.session.commit()
+    return sorted(job_ids)
+
+
+def rescore_jobs(job_ids):
+    """Merge new jobs into every stored recommendation set where they beat the user's weakest pick.
+
+    Only the new jobs are scored, so the cost is O(users) per job instead of a full regeneration.
+    """
+    features = JobFeatures(
+        db.session.execute(select(Job).where(Job.id.in_(job_ids))).scalars().all(),
+        job_skill_names(Job.id.in_(job_ids)),
+    )
+    if not len(features):
+        return 0
+
+    added = 0
+    last_id = 0
+    while True:
+        profiles = db.session.execute(
+            select(UserProfile)
+            .where(
+                UserProfile.user_id.in_(select(JobRecommendation.user_id)),
+                UserProfile.user_id > last_id,
+            )
+            .order_by(UserProfile.user_id)
+            .limit(app.config["RECOMMENDATION_RESCORE_BATCH_SIZE"])
+        ).scalars().all()
+        if not profiles:
+            return added
+        last_id = profiles[-1].user_id
+
+        current = {profile.user_id: [] for profile in profiles}
+        skills = user_skill_names(list(current))
+        for user_id, rec_id, job_id, score in db.session.execute(
+            select(JobRecommendation.user_id, JobRecommendation.id, JobRecommendation.job_id, JobRecommendation.match_score)
+            .where(JobRecommendation.user_id.in_(current))
+        ):
+            current[user_id].append((score or 0.0, rec_id, job_id))
+
+        evicted = []
+        rows = []
+        for profile in profiles:
+            held = current[profile.user_id]
+            held_jobs = {job_id for _, _, job_id in held}
+            # Best new job first, so a job added here is never evicted by a later one in the same pass
+            for rec in score_jobs(profile, features, limit=None, user_skills=skills.get(profile.user_id, set())):
+                if rec["job_id"] in held_jobs:
+                    continue
+                if len(held) >= RECOMMENDATION_TOP_N:
+                    lowest = min(held, key=lambda item: item[0])
+                    if rec["match_score"] <= lowest[0]:
+                        break
+                    held.remove(lowest)
+                    evicted.append(lowest[1])
+                held.append((rec["match_score"], None, rec["job_id"]))
+                rows.append(recommendation_values(profile.user_id, rec))
+
+        if evicted:
+            db.session.execute(db.delete(JobRecommendation).where(JobRecommendation.id.in_(evicted)))
+        if rows:
+            db.session.execute(insert(JobRecommendation), rows)
+        db.session.commit()
+        db.session.expunge_all()
+        added += len(rows)
+
+
+def rescore_new_jobs():
+    job_ids = claim_new_jobs(app.config["RECOMMENDATION_RESCORE_BATCH_SIZE"])
+    if job_ids:
+        try:
+            rescore_jobs(job_ids)
+        except Exception:
+            # Hand the jobs back for the next pass; batches already merged are skipped then as held jobs
+            db.session.rollback()
+            db.session.execute(
+                update(Job).where(Job.id.in_(job_ids)).values(rescored=False)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            raise
+    return len(job_ids)
+
+
+def recommendation_worker_process(poll_interval=2.0, once=False):
+    # Entry point of a forked worker process: connections inherited from the parent must not be shared
+    with app.app_context():
+        db.engine.dispose(close=False)
+    recommendation_worker_loop(poll_interval, once)
+
+
+def recommendation_worker_loop(poll_interval=2.0, once=False):
+    with app.app_context():
+        while True:
+            task = claim_recommendation_task()
+            if task is None:
+                # Between user requests, merge newly posted jobs into the stored recommendations
+                try:
+                    rescored = rescore_new_jobs()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Error rescoring new jobs: {e}")
+                    rescored = 0
+                db.session.remove()
+                if rescored:
+                    continue
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+            run_recommendation_task(task)
+            db.session.remove()
+
+
+PRECOMPUTE_JOB_COLUMNS = (
+    Job.id, Job.title, Job.description, Job.location, Job.job_type, Job.salary_range, Job.skills_required,
+)
+PRECOMPUTE_PROFILE_FIELDS = ("user_id", "skills", "location", "salary_range", "experience_years")
+
+# Parsed job catalogue, built once in each precompute pool process
+_precompute_features = None
+
+
+def init_precompute_worker(jobs):
+    global _precompute_features
+    _precompute_features = JobFeatures(
+        (SimpleNamespace(**job) for job in jobs), {job["id"]: job["skill_names"] for job in jobs}
+    )
+
+
+def score_profiles(profiles):
+    return [
+        (profile["user_id"], score_jobs(SimpleNamespace(**profile), _precompute_features, limit=RECOMMENDATION_TOP_N,
+                                        user_skills=profile["skill_names"]))
+        for profile in profiles
+    ]
+
+
+def up_to_date_user_ids(profiles, catalogue_version):
+    # Users with a finished run, from either engine, for their current profile and catalogue
+    engines = {"local", app.config["RECOMMENDATION_ENGINE"]}
+    pairs = [
+        (profile.user_id, recommendation_cache_key(profile, engine=engine, catalogue_version=catalogue_version))
+        for profile in profiles for engine in engines
+    ]
+    return set(db.session.execute(
+        select(RecommendationTask.user_id)
+        .where(
+            RecommendationTask.status == 'done',
+            # Matched as pairs: users with identical profiles share a key, which says nothing about each other
+            tuple_(RecommendationTask.user_id, RecommendationTask.cache_key).in_(pairs),
+        )
+    ).scalars())
+
+
+def save_precomputed_recommendations(results, cache_keys):
+    user_ids = [user_id for user_id, _ in results]
+    rows = [recommendation_values(user_id, rec) for user_id, recommendations in results for rec in recommendations]
+    now = datetime.now(timezone.utc)
+
+    db.session.execute(db.delete(JobRecommendation).where(JobRecommendation.user_id.in_(user_ids)))
+    if rows:
+        db.session.execute(insert(JobRecommendation), rows)
+    # A finished task per user lets the dashboard and the next precompute see these results as current
+    db.session.execute(insert(RecommendationTask), [
+        {
+            "user_id": user_id, "status": 'done', "message": "Recommendations precomputed",
+            "recommendation_count": len(recommendations), "cache_key": cache_keys[user_id],
+            "attempts": 1, "started_at": now, "finished_at": now,
+        }
+        for user_id, recommendations in results
+    ])
+    db.session.commit()
+
+
+def precompute_catalogue():
+    # Version first: a job posted while loading makes the stored keys stale rather than wrongly current
+    catalogue_version = current_catalogue_version()
+    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=app.config["RECOMMENDATION_MAX_JOB_AGE_DAYS"])
+    jobs = [row._asdict() for row in db.session.execute(select(*PRECOMPUTE_JOB_COLUMNS).where(Job.created_at >= since))]
+    skills = job_skill_names(Job.created_at >= since)
+    for job in jobs:
+        job["skill_names"] = skills.get(job["id"], set())
+    return catalogue_version, jobs
+
+
+def precompute_recommendations(catalogue_version, batch_size, pool=None, processes=1, force=False, after_id=0):
+    """Score verified job seekers against the job catalogue in user id order, one committed batch at a time."""
+    computed = 0
+    skipped = 0
+    last_id = after_id
+    while True:
+        profiles = db.session.execute(
+            select(UserProfile)
+            .join(User, User.id == UserProfile.user_id)
+            .where(User.role == "job_seeker", User.verified.is_(True), UserProfile.user_id > last_id)
+            .order_by(UserProfile.user_id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not profiles:
+            break
+        last_id = profiles[-1].user_id
+
+        cache_keys = {
+            profile.user_id: recommendation_cache_key(profile, engine="local", catalogue_version=catalogue_version)
+            for profile in profiles
+        }
+        # LLM recommendations that are still current are kept rather than replaced by local scores
+        current = set() if force else up_to_date_user_ids(profiles, catalogue_version)
+        skills = user_skill_names([profile.user_id for profile in profiles if profile.user_id not in current])
+        todo = [
+            {**{field: getattr(profile, field) for field in PRECOMPUTE_PROFILE_FIELDS},
+             "skill_names": skills.get(profile.user_id, set())}
+            for profile in profiles if profile.user_id not in current
+        ]
+        skipped += len(profiles) - len(todo)
+
+        if todo:
+            if pool is None:
+                results = score_profiles(todo)
+            else:
+                parts = list(chunked(todo, max(1, len(todo) // (processes * 4))))
+                results = [result for part in pool.map(score_profiles, parts) for result in part]
+            save_precomputed_recommendations(results, cache_keys)
+            computed += len(results)
+
+        db.session.expunge_all()
+        click.echo(f"up to user {last_id}: {computed} computed, {skipped} already up to date")
+
+    return computed, skipped
+
+
+recommendations_cli = AppGroup("recommendations", help="Job recommendation commands.")
+
+
+@recommendations_cli.command("worker")
+@click.option("--processes", default=2, show_default=True, help="Number of worker processes.")
+@click.option("--poll-interval", default=2.0, show_default=True, help="Seconds to wait when the queue is empty.")
+@click.option("--once", is_flag=True, help="Drain the queue and exit.")
+def recommendations_worker(processes, poll_interval, once):
+    """Run queued recommendation tasks."""
+    if app.config["METRICS_ENABLED"]:
+        # Set PROMETHEUS_MULTIPROC_DIR with --processes > 1 so the child processes' samples are included
+        init_worker_metrics(app.config["METRICS_WORKER_PORT"], app.config["METRICS_PUSHGATEWAY"])
+
+    if processes <= 1:
+        recommendation_worker_loop(poll_interval, once)
+        return
+
+    workers = [
+        multiprocessing.Process(target=recommendation_worker_process, args=(poll_interval, once))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+@recommendations_cli.command("precompute")
+@click.option("--batch-size", default=500, show_default=True, help="Job seekers per batch.")
+@click.option("--processes", default=os.cpu_count(), show_default=True, help="Scoring processes.")
+@click.option("--after-id", default=0, show_default=True, help="Resume after this user id.")
+@click.option("--force", is_flag=True, help="Recompute users whose profile and the catalogue haven't changed.")
+def recommendations_precompute(batch_size, processes, after_id, force):
+    """Precompute recommendations for all verified job seekers with the local scorer."""
+    catalogue_version, jobs = precompute_catalogue()
+    if processes <= 1:
+        init_precompute_worker(jobs)
+        computed, skipped = precompute_recommendations(catalogue_version, batch_size, force=force, after_id=after_id)
+    else:
+        # The catalogue is sent to each pool process once, not with every batch
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_precompute_worker, initargs=(jobs,)) as pool:
+            computed, skipped = precompute_recommendations(
+                catalogue_version, batch_size, pool, processes, force=force, after_id=after_id
+            )
+    click.echo(f"Done: {computed} computed, {skipped} already up to date.")
+
+
+app.cli.add_command(recommendations_cli)
+
+
+jobs_cli = AppGroup("jobs", help="Job catalogue maintenance commands.")
+
+
+@jobs_cli.command("reconcile-counters")
+def jobs_reconcile_counters():
+    """Recount applications and repair drifted Job counters."""
+    repaired = reconcile_job_counters()
+    click.echo(f"Repaired application counters on {repaired} job(s).")
+
+
+app.cli.add_command(jobs_cli)
+
+
+assets_cli = AppGroup("assets", help="Static asset build commands.")
+
+
+@assets_cli.command("build")
+@click.option("--clean", is_flag=True, help="Remove files left over from earlier builds.")
+def assets_build(clean):
+    """Fingerprint and precompress static files; restart the app to serve the new names."""
+    manifest = build_assets(app.static_folder, clean=clean)
+    click.echo(f"Built {len(manifest)} asset(s) into {os.path.join(app.static_folder, 'dist')}.")
+
+
+app.cli.add_command(assets_cli)
+
+
+import_cli = AppGroup("import", help="Bulk import candidates and jobs from CSV or XLSX files.")
+
+CANDIDATE_REQUIRED = ("email", "password", "full_name", "location")
+CANDIDATE_PROFILE_FIELDS = (
+    "full_name", "location", "skills", "bio", "about_me", "certification", "salary_range", "grade",
+    "area_of_specialization", "year_of_graduation", "institution", "degree", "duties_in_last_company",
+    "position_held", "year_start", "year_end", "company_name",
+)
+JOB_REQUIRED = ("title", "location", "job_type", "salary_range", "description", "skills")
+
+
+def column_length_errors(model, values):
+    # Report over-long values per row instead of failing the whole batch in the database
+    errors = []
+    for key, value in values.items():
+        column = model.__table__.columns.get(key)
+        length = getattr(column.type, "length", None) if column is not None else None
+        if length and isinstance(value, str) and len(value) > length:
+            errors.append(f"{key} is longer than {length} characters")
+    return errors
+
+
+def import_candidate_chunk(chunk, pool):
+    errors = []
+    valid = []
+    seen = set()
+    for number, row in chunk:
+        missing = [field for field in CANDIDATE_REQUIRED if not row.get(field)]
+        if missing:
+            errors.append((number, f"missing {', '.join(missing)}"))
+            continue
+        if row["email"] in seen:
+            errors.append((number, f"duplicate email {row['email']} in file"))
+            continue
+        try:
+            experience_years = int(float(row.get("experience_years") or 0))
+            if not 0 <= experience_years <= 100:
+                raise ValueError
+        except (ValueError, OverflowError, TypeError):
+            # OverflowError: "inf" and "1e400" parse as floats but have no int value
+            errors.append((number, f"invalid experience_years: {row['experience_years']}"))
+            continue
+
+        profile = {field: row.get(field) or None for field in CANDIDATE_PROFILE_FIELDS}
+        profile.update(
+            bio=row.get("bio") or "", company_name=row.get("company_name") or "",
+            experience_years=experience_years, role="job_seeker"
+        )
+        length_errors = column_length_errors(UserProfile, profile) + column_length_errors(User, {"email": row["email"]})
+        if length_errors:
+            errors.append((number, "; ".join(length_errors)))
+            continue
+
+        seen.add(row["email"])
+        valid.append((number, row, profile))
+
+    existing = set(db.session.execute(select(User.email).where(User.email.in_(seen))).scalars())
+    for number, row, _ in valid:
+        if row["email"] in existing:
+            errors.append((number, f"email {row['email']} is already registered"))
+    valid = [item for item in valid if item[1]["email"] not in existing]
+    if not valid:
+        return 0, errors
+
+    # pbkdf2 dominates the import time, so hash the whole chunk across the process pool
+    passwords = [row["password"] for _, row, _ in valid]
+    hashes = pool.map(hash_password, passwords, chunksize=max(1, len(passwords) // 32)) if pool else map(hash_password, passwords)
+
+    try:
+        user_ids = dict(db.session.execute(
+            insert(User).returning(User.email, User.id),
+            [
+                {"email": row["email"], "password": hashed, "phone": row.get("phone") or "",
+                 "role": "job_seeker", "verified": True}
+                for (_, row, _), hashed in zip(valid, hashes)
+            ]
+        ).all())
+
+        db.session.execute(insert(UserProfile), [
+            {**profile, "user_id": user_ids[row["email"]]} for _, row, profile in valid
+        ])
+
+        skill_ids = bulk_skill_ids(profile["skills"] for _, _, profile in valid)
+        user_skills = [
+            {"user_id": user_ids[row["email"]], "skill_id": skill_ids[name]}
+            for _, row, profile in valid for name in split_skills(profile["skills"])
+        ]
+        if user_skills:
+            db.session.execute(insert(UserSkill), user_skills)
+
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return 0, errors + [(number, f"batch failed: {e}") for number, _, _ in valid]
+
+    return len(valid), errors
+
+
+def import_job_chunk(chunk, default_employer_email):
+    errors = []
+    valid = []
+    for number, row in chunk:
+        missing = [field for field in JOB_REQUIRED if not row.get(field)]
+        employer_email = row.get("employer_email") or default_employer_email
+        if not employer_email:
+            missing.append("employer_email")
+        if missing:
+            errors.append((number, f"missing {', '.join(missing)}"))
+            continue
+        valid.append((number, row, employer_email))
+
+    employers = {
+        email: (user_id, company_name)
+        for email, user_id, company_name in db.session.execute(
+            select(User.email, User.id, UserProfile.company_name)
+            .outerjoin(UserProfile, UserProfile.user_id == User.id)
+            .where(User.email.in_({email for _, _, email in valid}), User.role == "company")
+        )
+    }
+
+    jobs = []
+    for number, row, employer_email in valid:
+        if employer_email not in employers:
+            errors.append((number, f"no company account for {employer_email}"))
+            continue
+        employer_id, company_name = employers[employer_email]
+        job = {
+            "employer_id": employer_id,
+            "company": row.get("company") or company_name or "",
+            "title": row["title"],
+            "location": row["location"],
+            "job_type": row["job_type"],
+            "salary_range": row["salary_range"],
+            "description": row["description"],
+            "skills_required": row["skills"],
+            "requirements": row.get("requirements") or "vacant for now",
+        }
+        length_errors = column_length_errors(Job, job)
+        if length_errors:
+            errors.append((number, "; ".join(length_errors)))
+            continue
+        jobs.append((number, job))
+
+    if not jobs:
+        return 0, errors
+
+    try:
+        insert_jobs([job for _, job in jobs])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return 0, errors + [(number, f"batch failed: {e}") for number, _ in jobs]
+
+    return len(jobs), errors
+
+
+def run_import(path, batch_size, import_chunk):
+    imported = 0
+    failed = 0
+    for chunk in chunked(iter_rows(path), batch_size):
+        count, errors = import_chunk(chunk)
+        imported += count
+        failed += len(errors)
+        for number, message in sorted(errors):
+            click.echo(f"row {number}: {message}", err=True)
+        click.echo(f"{imported} imported, {failed} failed")
+    click.echo(f"Done: {imported} imported, {failed} failed.")
+
+
+@import_cli.command("candidates")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=1000, show_default=True, help="Rows per insert batch.")
+@click.option("--processes", default=os.cpu_count(), show_default=True, help="Password hashing processes.")
+def import_candidates(path, batch_size, processes):
+    """Import job seekers and their profiles from a CSV or XLSX file."""
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        run_import(path, batch_size, lambda chunk: import_candidate_chunk(chunk, pool))
+
+
+@import_cli.command("jobs")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--employer-email", help="Company account for rows without an employer_email column.")
+@click.option("--batch-size", default=1000, show_default=True, help="Rows per insert batch.")
+def import_jobs(path, employer_email, batch_size):
+    """Import jobs from a CSV or XLSX file."""
+    run_import(path, batch_size, lambda chunk: import_job_chunk(chunk, employer_email))
+
+
+app.cli.add_command(import_cli)
+
+
+def hot_queries(user_id, employer_id):
+    # The queries each route runs on every page view, with representative parameters
+    return {
+        "apply_job: existing application": (
+            select(Application).where(Application.user_id == user_id, Application.job_id == 1)
+        ),
+        "job_seeker_dashboard: jobs page": (
+            select(Job).order_by(Job.created_at.desc(), Job.id.desc()).limit(21)
+        ),
+        "job_seeker_dashboard: applications": (
+            select(Application).where(Application.user_id == user_id).order_by(Application.applied_at)
+        ),
+        "job_seeker_dashboard: recommendations": (
+            select(JobRecommendation)
+            .where(JobRecommendation.user_id == user_id)
+            .order_by(JobRecommendation.match_score.desc())
+        ),
+        "company_dashboard: jobs": (
+            select(Job).where(Job.employer_id == employer_id).order_by(Job.created_at.desc())
+        ),
+        "company_dashboard: recent applications": (
+            select(Application)
+            .join(Job)
+            .where(Job.employer_id == employer_id)
+            .order_by(Application.applied_at.desc())
+            .limit(10)
+        ),
+    }
+
+
+@app.cli.command("create-db")
+def create_db():
+    """Create every table for a new, empty database and mark it as migrated to the latest revision."""
+    db.create_all()
+    with db.engine.begin() as connection:
+        ensure_search_index(connection)
+    # The migrations only hold changes on top of the original schema, so they are skipped here
+    stamp()
+    click.echo("Database created.")
+
+
+@app.cli.command("explain-queries")
+@click.option("--user-id", default=1, show_default=True, help="Job seeker id to plan the queries for.")
+@click.option("--employer-id", default=1, show_default=True, help="Company id to plan the queries for.")
+def explain_queries(user_id, employer_id):
+    """Print the database query plan for each route's hot queries."""
+    for name, statement in hot_queries(user_id, employer_id).items():
+        click.echo(f"== {name}")
+        for line in explain(db.session, statement):
+            click.echo(f"   {line}")
+        click.echo()
+
+
+
+def encode_job_cursor(job):
+    raw = f"{job.created_at.isoformat()}|{job.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_job_cursor(cursor):
+    try:
+        created_at, job_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(job_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def jobs_page(cursor=None, limit=None, skill=None):
+    # Keyset pagination on (created_at, id), so every page costs the same no matter how deep
+    limit = limit or app.config["JOBS_PAGE_SIZE"]
+    query = (
+        select(Job)
+        .options(selectinload(Job.skills))
+        .order_by(Job.created_at.desc(), Job.id.desc())
+        .limit(limit + 1)
+    )
+
+    if skill:
+        query = query.join(JobSkill, JobSkill.job_id == Job.id).join(Skill, Skill.id == JobSkill.skill_id)
+        query = query.where(Skill.name == canonical_skill(skill))
+
+    if cursor:
+        created_at, job_id = decode_job_cursor(cursor)
+        query = query.where(or_(
+            Job.created_at < created_at,
+            (Job.created_at == created_at) & (Job.id < job_id)
+        ))
+
+    jobs = db.session.execute(query).scalars().all()
+    next_cursor = encode_job_cursor(jobs[limit - 1]) if len(jobs) > limit else None
+    return jobs[:limit], next_cursor
+
+
+template_fingerprints = {}
+
+
+def template_fingerprint(name):
+    # Part of the page validators, so a changed template isn't served from a stale browser copy
+    fingerprint = template_fingerprints.get(name)
+    if fingerprint is None or app.debug:
+        source, _, _ = app.jinja_env.loader.get_source(app.jinja_env, name)
+        fingerprint = template_fingerprints[name] = hashlib.sha1(source.encode()).hexdigest()[:12]
+    return fingerprint
+
+
+fragment_cache = FragmentCache(
+    maxsize=app.config["FRAGMENT_CACHE_SIZE"],
+    ttl=app.config["FRAGMENT_CACHE_TTL"],
+    store=FileFragmentStore(app.config["FRAGMENT_CACHE_DIR"]) if app.config["FRAGMENT_CACHE_DIR"] else None
+)
+
+# Everything job-card.html shows; editing any of these changes the card
+JOB_CARD_FIELDS = ("title", "company", "location", "job_type", "salary_range", "description", "created_at",
+                   "skills_required", "skills")
+
+
+def job_card(job):
+    # The card is the same for every viewer, so it is rendered once per version of the job
+    version = f"{job.updated_at.isoformat()}:{template_fingerprint('job-card.html')}"
+    html = fragment_cache.fetch(
+        f"job-card:{job.id}", version,
+        lambda: app.jinja_env.get_template("job-card.html").render(job=job)
+    )
+    return Markup(html)
+
+
+app.jinja_env.globals["job_card"] = job_card
+
+
+def invalidate_job_card(job_id):
+    fragment_cache.invalidate(f"job-card:{job_id}")
+
+
+@event.listens_for(Job, "before_update")
+def touch_edited_job(mapper, connection, job):
+    # Counter updates leave the card alone; only edits to what it shows move updated_at
+    state = sa_inspect(job)
+    if any(state.attrs[field].history.has_changes() for field in JOB_CARD_FIELDS):
+        job.updated_at = datetime.now(timezone.utc)
+        # The catalogue version is part of the page ETags and recommendation cache keys
+        connection.execute(catalogue_version_bump())
+
+
+@event.listens_for(Job, "after_update")
+def drop_job_card(mapper, connection, job):
+    invalidate_job_card(job.id)
+
+
+@event.listens_for(Job, "after_delete")
+def drop_deleted_job(mapper, connection, job):
+    invalidate_job_card(job.id)
+    connection.execute(catalogue_version_bump())
+
+
+def catalogue_validators():
+    # Every job insert bumps the catalogue row, so it stands in for max(Job.updated_at) at one row's cost
+    return select(
+        select(CatalogueVersion.version).where(CatalogueVersion.id == 1).scalar_subquery().label("catalogue_version"),
+        select(CatalogueVersion.updated_at).where(CatalogueVersion.id == 1).scalar_subquery().label("catalogue_updated_at"),
+    )
+
+
+def seeker_dashboard_validators(user_id):
+    """ETag parts and Last-Modified for the job seeker dashboard, read in a single query."""
+    latest_task = select(RecommendationTask).where(RecommendationTask.user_id == user_id).order_by(RecommendationTask.id.desc()).limit(1).subquery()
+    row = db.session.execute(
+        catalogue_validators().add_columns(
+            select(func.max(Application.updated_at)).where(Application.user_id == user_id).scalar_subquery().label("applications_updated_at"),
+            select(func.count(Application.id)).where(Application.user_id == user_id).scalar_subquery(),
+            select(func.max(JobRecommendation.recommended_at)).where(JobRecommendation.user_id == user_id).scalar_subquery().label("recommended_at"),
+            select(func.count(JobRecommendation.id)).where(JobRecommendation.user_id == user_id).scalar_subquery(),
+            select(latest_task.c.id).scalar_subquery(),
+            select(latest_task.c.status).scalar_subquery(),
+        )
+    ).one()
+    return list(row), latest(row.catalogue_updated_at, row.applications_updated_at, row.recommended_at)
+
+
+def company_dashboard_validators(employer_id):
+    """ETag parts and Last-Modified for the company dashboard, read in a single query."""
+    employer_applications = select(Application.updated_at).join(Job).where(Job.employer_id == employer_id).subquery()
+    row = db.session.execute(
+        catalogue_validators().add_columns(
+            select(func.max(employer_applications.c.updated_at)).scalar_subquery().label("applications_updated_at"),
+            select(func.count()).select_from(employer_applications).scalar_subquery(),
+        )
+    ).one()
+    return list(row), latest(row.catalogue_updated_at, row.applications_updated_at)
+
+
+def job_to_dict(job):
+    return {
+        "id": job.id,
+        "title": job.title,
+        "company": job.company,
+        "location": job.location,
+        "job_type": job.job_type,
+        "salary_range": job.salary_range,
+        "description": job.description,
+        "skills": [skill.display_name for skill in job.skills],
+        "created_at": job.created_at.isoformat(),
+        "posted": job.created_at.strftime("%B %d, %Y"),
+    }
+
 
 @app.route("/")
 def index():
@@ -400,24 +2035,26 @@ def logout():
 
 
 @app.route("/company-dashboard")
+@route_query_budget(app, db, 6)
 @login_required
 def company_dashboard():
     if current_user.role != "company":
         abort(403)
 
-    # Get jobs with application counts in one query
-    jobs_query = (
-        select(
-            Job,
-            func.count(Application.id).label('app_count')
-        )
-        .outerjoin(Application, Job.id == Application.job_id)
+    parts, last_modified = company_dashboard_validators(current_user.id)
+    parts += [current_user.id, current_user.profile.updated_at if current_user.profile else None,
+              template_fingerprint("company-dashboard.html")]
+    cached = not_modified(parts, last_modified)
+    if cached is not None:
+        return cached
+
+    # Application counts are stored on each job, so no join over applications is needed
+    jobs = db.session.execute(
+        select(Job)
+        .options(selectinload(Job.skills))
         .where(Job.employer_id == current_user.id)
-        .group_by(Job.id)
         .order_by(Job.created_at.desc())
-    )
-
-    jobs_with_counts = db.session.execute(jobs_query).all()
+    ).scalars().all()
 
     # Get recent applications
     recent_applications = db.session.execute(
@@ -432,30 +2069,22 @@ def company_dashboard():
         .limit(10)  # Only get recent 10
     ).scalars().all()
 
-    # Get all applications for stats
-    all_applications = db.session.execute(
-        select(Application)
-        .join(Job)
-        .where(Job.employer_id == current_user.id)
-    ).scalars().all()
 
     # Get company profile
-    company_profile = db.session.execute(
-        select(UserProfile).where(UserProfile.user_id == current_user.id)
-    ).scalar()
+    company_profile = current_user.profile
 
     company_name = company_profile.company_name if company_profile else "Company"
 
     # Statistics
-    total_applications = len(all_applications)
-    under_review = sum(1 for app in all_applications if app.status == 'Under Review')
-    accepted = sum(1 for app in all_applications if app.status == 'Accepted')
-    rejected = sum(1 for app in all_applications if app.status == 'Rejected')
+    total_applications = sum(job.application_count for job in jobs)
+    under_review = sum(job.under_review_count for job in jobs)
+    accepted = sum(job.accepted_count for job in jobs)
+    rejected = sum(job.rejected_count for job in jobs)
 
     return render_template(
         "company-dashboard.html",
         current_user=current_user,
-        jobs_with_counts=jobs_with_counts,
+        jobs=jobs,
         company_name=company_name,
         recent_applications=recent_applications,
         total_applications=total_applications,
@@ -471,8 +2100,7 @@ def post_job():
     try:
         data = request.get_json()
 
-        result = db.session.execute(select(UserProfile).where(UserProfile.id == current_user.id)).scalar_one()
-        company_name = result.company_name
+        company_name = current_user.profile.company_name
 
         if not data:
             return jsonify({"status": "error", "message": "No data provided"}), 400
@@ -489,9 +2117,12 @@ def post_job():
             skills_required=data.get("skills"),
             requirements="vacant for now"
         )
+        new_job.skills = get_or_create_skills(new_job.skills_required)
 
         db.session.add(new_job)
+        bump_catalogue_version()
         db.session.commit()
+        start_inline_worker()
 
         return jsonify({
             "status": "success",
@@ -504,6 +2135,83 @@ def post_job():
         return jsonify({'status': 'error', 'message': f'Failed to post job: {str(e)}'}), 500
 
 
+# Same keys as the /api/post-job form payload
+BULK_JOB_FIELDS = {
+    "job-title": "title",
+    "location": "location",
+    "job-type": "job_type",
+    "salary-range": "salary_range",
+    "description": "description",
+    "skills": "skills_required",
+}
+
+
+def bulk_job_values(data, employer_id, company_name):
+    missing = [key for key in BULK_JOB_FIELDS if not isinstance(data.get(key), str) or not data[key].strip()]
+    if missing:
+        return None, f"missing {', '.join(missing)}"
+
+    job = {column: data[key].strip() for key, column in BULK_JOB_FIELDS.items()}
+    job.update(employer_id=employer_id, company=company_name or "", requirements="vacant for now")
+    length_errors = column_length_errors(Job, job)
+    if length_errors:
+        return None, "; ".join(length_errors)
+    return job, None
+
+
+@app.route("/api/jobs/bulk", methods=["POST"])
+@login_required
+def bulk_post_jobs():
+    """Post many jobs from an NDJSON body (one /api/post-job payload per line).
+
+    The body is read and inserted one batch at a time, and the response is streamed
+    back as NDJSON: one result per input line followed by a summary line.
+    """
+    if current_user.role != "company":
+        return jsonify({"status": "error", "message": "Only company accounts can post jobs"}), 403
+
+    employer_id = current_user.id
+    company_name = current_user.profile.company_name if current_user.profile else ""
+    lines = iter_ndjson(request.stream, app.config["JOBS_BULK_MAX_LINE_BYTES"])
+
+    def results():
+        created = 0
+        failed = 0
+        for batch in chunked(lines, app.config["JOBS_BULK_BATCH_SIZE"]):
+            output = []
+            jobs = []
+            for number, data, error in batch:
+                if data is not None:
+                    job, error = bulk_job_values(data, employer_id, company_name)
+                if error:
+                    output.append({"line": number, "status": "error", "message": error})
+                else:
+                    jobs.append((number, job))
+
+            if jobs:
+                try:
+                    job_ids = insert_jobs([job for _, job in jobs])
+                    db.session.commit()
+                    output.extend({"line": number, "status": "created", "job_id": job_id}
+                                  for (number, _), job_id in zip(jobs, job_ids))
+                except Exception as e:
+                    print(f"Error posting job batch: {e}")
+                    db.session.rollback()
+                    output.extend({"line": number, "status": "error", "message": f"batch failed: {e}"}
+                                  for number, _ in jobs)
+
+            output.sort(key=lambda result: result["line"])
+            created += sum(result["status"] == "created" for result in output)
+            failed += sum(result["status"] == "error" for result in output)
+            yield "".join(json.dumps(result) + "\n" for result in output)
+
+        if created:
+            start_inline_worker()
+        yield json.dumps({"status": "done", "created": created, "failed": failed}) + "\n"
+
+    return Response(stream_with_context(results()), mimetype="application/x-ndjson")
+
+
 @app.route("/apply-job", methods=["POST"])
 @login_required
 def apply_job():
@@ -530,196 +2238,166 @@ def apply_job():
         new_application = Application(
             match_score=90.0,
             user_id=current_user.id,
-            job_id=job_id
+            job_id=job.id,
+            status='Under Review'
         )
 
         db.session.add(new_application)
+        adjust_job_counters(job.id, new_application.status)
         db.session.commit()
 
         flash("Application submitted successfully", "success")
         return redirect(url_for("job_seeker_dashboard"))
 
+    except IntegrityError:
+        # Lost a race with a duplicate submit, the unique (user_id, job_id) index caught it
+        db.session.rollback()
+        flash("You have already applied to this job", "warning")
+        return redirect(url_for("job_seeker_dashboard"))
+
     except Exception as e:
         print(f"Error applying for job: {e}")
         db.session.rollback()
         flash("Failed to submit application. Please try again.", "error")
         return redirect(url_for("jobs"))
 
-@app.route("/job-seeker-dashboard", methods=["GET", "POST"])
+@app.route("/api/applications/<int:application_id>/status", methods=["POST"])
 @login_required
-def job_seeker_dashboard():
-    # Get the current user
-    user = db.session.execute(
-        db.select(UserProfile).where(UserProfile.user_id == current_user.id)
-    ).scalar_one_or_none()
-
-
-    if not user:
-        flash("User not found", "error")
-        return redirect(url_for("job_seeker-dashboard"))
-
-    if request.method == "POST":
-        # Generate new recommendations
-        jobs = db.session.execute(db.select(Job)).scalars().all()
-
-        if not jobs:
-            flash("No jobs available for recommendations", "warning")
-            return render_template("job-seeker-dashboard.html",
-                                   full_name=user.full_name,
-                                   jobs=jobs,
-                                   recommendations=[],
-                                   has_recommendations=False)
-
-        try:
-            # client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-            client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
-            # Create detailed job information for the prompt
-            jobs_list = [
-                {
-                    'id': job.id,
-                    'title': job.title,
-                    'company': job.company,
-                    'required_skills': job.skills_required,
-                    'location': job.location,
-                    'salary_range': job.salary_range,
-                    'job_type': job.job_type,
-                    'description': job.description
-                }
-                for job in jobs
-            ]
-
-            prompt = f"""
-                        Analyze and match jobs to this user.
+def update_application_status(application_id):
+    if current_user.role != "company":
+        abort(403)
 
-                        User Profile:
-                        - Skills: {user.skills}
-                        - Location: {getattr(user.location, 'location', 'Not specified')}
+    application = db.get_or_404(Application, application_id)
+    if application.job.employer_id != current_user.id:
+        abort(403)
 
-                        Available Jobs:
-                        {json.dumps(jobs_list, indent=2)}
+    data = request.get_json(silent=True) or {}
+    status = data.get("status")
+    if status not in APPLICATION_STATUS_COUNTERS:
+        return jsonify({"status": "error", "message": f"Invalid status: {status}"}), 400
 
-                        Calculate match scores (0.0 to 1.0) for:
-                        - skill_match_score: How well user's skills match required skills
-                        - location_match_score: Location compatibility
-                        - experience_match_score: Experience level match
-                        - Overall match_score (weighted average)
+    try:
+        change_application_status(application, status)
+        db.session.commit()
+    except Exception as e:
+        print(f"Error updating application status: {e}")
+        db.session.rollback()
+        return jsonify({"status": "error", "message": f"Failed to update status: {str(e)}"}), 500
+
+    return jsonify({"status": "success", "application_status": application.status})
+
+
+APPLICATION_EXPORT_COLUMNS = (
+    ("Application ID", Application.id),
+    ("Job ID", Job.id),
+    ("Job Title", Job.title),
+    ("Applicant", UserProfile.full_name),
+    ("Email", User.email),
+    ("Phone", User.phone),
+    ("Location", UserProfile.location),
+    ("Skills", UserProfile.skills),
+    ("Experience (years)", UserProfile.experience_years),
+    ("Status", Application.status),
+    ("Match Score", Application.match_score),
+    ("Applied At", Application.applied_at),
+    ("Reviewed At", Application.reviewed_at),
+    ("Resume", Application.resume_url),
+)
+
+
+@app.route("/api/applications/export")
+@login_required
+def export_applications():
+    """Download the employer's applications as CSV or XLSX (?format=xlsx), optionally for one ?job_id."""
+    if current_user.role != "company":
+        abort(403)
 
-                        CRITICAL: Return ONLY valid JSON, no other text. Use this exact structure:
+    file_format = request.args.get("format", "csv")
+    if file_format not in ("csv", "xlsx"):
+        return jsonify({"status": "error", "message": f"Invalid format: {file_format}"}), 400
 
-                        {{
-                            "recommendations": [
-                                {{
-                                    "job_id": 1,
-                                    "match_score": 0.85,
-                                    "skill_match_score": 0.9,
-                                    "location_match_score": 1.0,
-                                    "experience_match_score": 0.85,
-                                    "match_reasons": {{"skills": "Strong Python and JavaScript match", "location": "Same city"}},
-                                    "missing_skills": {{"required": ["Docker", "AWS"], "recommendation": "Consider learning cloud technologies"}}
-                                }}
-                            ]
-                        }}
+    statement = (
+        select(*(column for _, column in APPLICATION_EXPORT_COLUMNS))
+        .join(Job, Application.job_id == Job.id)
+        .join(User, Application.user_id == User.id)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .where(Job.employer_id == current_user.id)
+        .order_by(Job.id, Application.applied_at, Application.id)
+        # Server-side cursor: rows arrive in batches instead of being buffered up front
+        .execution_options(yield_per=app.config["EXPORT_BATCH_SIZE"])
+    )
+    job_id = request.args.get("job_id", type=int)
+    if job_id is not None:
+        statement = statement.where(Job.id == job_id)
 
-                        Recommend the top 5 best matching jobs, ordered by match_score (highest first).
-                        Return ONLY the JSON, nothing else.
-                        """
+    header = [name for name, _ in APPLICATION_EXPORT_COLUMNS]
 
-            response = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1024,
-                messages=[{"role": "user", "content": prompt}]
-            )
+    def batches():
+        result = db.session.execute(statement)
+        try:
+            for rows in result.partitions():
+                yield rows
+        finally:
+            result.close()
+
+    filename = f"applications-{datetime.now(timezone.utc):%Y%m%d}.{file_format}"
+    if file_format == "xlsx":
+        body = iter_xlsx(header, batches(), sheet_name="Applications")
+        mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        body = iter_csv(header, batches())
+        mimetype = "text/csv"
 
-            # Extract response text
-            response_text = response.content[0].text.strip()
-
-            print("=" * 50)
-            print("Claude Response:")
-            print(response_text)
-            print("=" * 50)
-
-            # Try to extract JSON from the response
-            # Method 1: Check if it's already pure JSON
-            try:
-                recommendations_data = json.loads(response_text)
-            except json.JSONDecodeError:
-                # Method 2: Extract JSON using regex (find content between { and })
-                json_match = re.search(r'\{[\s\S]*\}', response_text)
-                if json_match:
-                    json_str = json_match.group(0)
-                    recommendations_data = json.loads(json_str)
-                else:
-                    # Method 3: Try to find JSON in code blocks
-                    code_block_match = re.search(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```', response_text)
-                    if code_block_match:
-                        json_str = code_block_match.group(1)
-                        recommendations_data = json.loads(json_str)
-                    else:
-                        raise ValueError("Could not extract valid JSON from response")
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}", "Cache-Control": "no-store"},
+    )
 
-            # Validate response structure
-            if 'recommendations' not in recommendations_data:
-                raise ValueError("Response missing 'recommendations' key")
 
-            # Delete old recommendations
-            db.session.execute(
-                db.delete(JobRecommendation).where(JobRecommendation.user_id == user.id)
-            )
-
-            # Save new recommendations
-            saved_count = 0
-            for rec in recommendations_data.get('recommendations', []):
-                # Validate required fields
-                if 'job_id' not in rec or 'match_score' not in rec:
-                    print(f"Skipping invalid recommendation: {rec}")
-                    continue
+@app.route("/job-seeker-dashboard", methods=["GET", "POST"])
+@route_query_budget(app, db, 10)
+@login_required
+def job_seeker_dashboard():
+    # Get the current user's profile, loaded together with the user by load_user
+    user = current_user.profile
 
-                job_recommendation = JobRecommendation(
-                    user_id=user.id,
-                    job_id=rec['job_id'],
-                    match_score=rec['match_score'],
-                    skill_match_score=rec.get('skill_match_score'),
-                    location_match_score=rec.get('location_match_score'),
-                    salary_match_score=rec.get('salary_match_score'),
-                    experience_match_score=rec.get('experience_match_score'),
-                    match_reasons=json.dumps(rec.get('match_reasons', {})),
-                    missing_skills=json.dumps(rec.get('missing_skills', {})),
-                )
-                db.session.add(job_recommendation)
-                saved_count += 1
 
-            db.session.commit()
+    if not user:
+        flash("User not found", "error")
+        return redirect(url_for("job_seeker-dashboard"))
 
-            if saved_count > 0:
-                flash(f"Generated {saved_count} job recommendations successfully!", "success")
-            else:
-                flash("No valid recommendations were generated. Please try again.", "warning")
+    if request.method == "POST":
+        # Generation runs in the worker, the dashboard polls for the result
+        task = enqueue_recommendation_task(user)
+        if task and task.status == 'done':
+            flash("Your recommendations are already up to date.", "info")
+        else:
+            flash("Generating your recommendations, this page will update when they are ready.", "info")
+        return redirect(url_for("job_seeker_dashboard"))
 
-        except json.JSONDecodeError as e:
-            db.session.rollback()
-            print(f"JSON Decode Error: {e}")
-            print(f"Response text was: {response_text[:500]}")  # Print first 500 chars
-            flash(f"Error parsing AI response. Please try again.", "error")
-        except ValueError as e:
-            db.session.rollback()
-            print(f"Value Error: {e}")
-            flash(f"Invalid AI response format. Please try again.", "error")
-        except Exception as e:
-            db.session.rollback()
-            print(f"Unexpected Error: {e}")
-            flash(f"Error generating recommendations: {str(e)}", "error")
+    # Nothing on the page changed since the browser's copy: skip the queries and the render
+    parts, last_modified = seeker_dashboard_validators(current_user.id)
+    parts += [current_user.id, user.updated_at, template_fingerprint("job-seeker-dashboard.html"),
+              template_fingerprint("job-card.html")]
+    cached = not_modified(parts, last_modified)
+    if cached is not None:
+        return cached
 
-    # GET request or after POST - Display recommendations
-    jobs = db.session.execute(
-        db.select(Job).order_by(Job.created_at.desc())).scalars().all()
+    # Display recommendations, only the first page of jobs is rendered, the rest load on scroll
+    jobs, next_cursor = jobs_page()
 
+    # The template reads application.job for every card, so load the jobs in the same query
     applications = db.session.execute(
-        db.select(Application).where(Application.user_id == current_user.id).order_by(
-            Application.applied_at)).scalars().all()
+        db.select(Application)
+        .options(joinedload(Application.job))
+        .where(Application.user_id == current_user.id)
+        .order_by(Application.applied_at)).scalars().all()
 
     recommendations_query = db.session.execute(
         db.select(JobRecommendation)
-        .where(JobRecommendation.user_id == user.id)
+        .options(selectinload(JobRecommendation.job).selectinload(Job.skills))
+        .where(JobRecommendation.user_id == current_user.id)
         .order_by(JobRecommendation.match_score.desc())
     ).scalars().all()
 
@@ -729,6 +2407,7 @@ def job_seeker_dashboard():
         missing_skills = json.loads(rec.missing_skills) if rec.missing_skills else {}
 
         recommendations_data.append({
+            'id': rec.id,
             'job': rec.job,
             'match_score': rec.match_score,
             'skill_match_score': rec.skill_match_score,
@@ -746,14 +2425,170 @@ def job_seeker_dashboard():
         "job-seeker-dashboard.html",
         full_name=user.full_name,
         jobs=jobs,
+        next_cursor=next_cursor,
         current_user=current_user,
         applications=applications,
         recommendations=recommendations_data,
         has_recommendations=len(recommendations_data) > 0,
+        recommendation_task=latest_recommendation_task(current_user.id),
         user_skills=user.skills,
         user_profile=user
     )
 
 
+@app.route("/api/jobs")
+@login_required
+def list_jobs():
+    limit = request.args.get("limit", app.config["JOBS_PAGE_SIZE"], type=int)
+    limit = max(1, min(limit, app.config["JOBS_PAGE_SIZE_MAX"]))
+
+    catalogue_version, catalogue_updated_at = db.session.execute(catalogue_validators()).one()
+    cached = not_modified(["jobs", catalogue_version, catalogue_updated_at], latest(catalogue_updated_at))
+    if cached is not None:
+        return cached
+
+    try:
+        jobs, next_cursor = jobs_page(request.args.get("cursor"), limit, request.args.get("skill"))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    return jsonify({
+        "jobs": [job_to_dict(job) for job in jobs],
+        "next_cursor": next_cursor,
+    })
+
+
+@app.route("/api/jobs/search")
+@login_required
+def search_jobs():
+    query = request.args.get("q", "").strip()
+    page = max(1, request.args.get("page", 1, type=int))
+    limit = request.args.get("limit", app.config["JOBS_PAGE_SIZE"], type=int)
+    limit = max(1, min(limit, app.config["JOBS_PAGE_SIZE_MAX"]))
+
+    if not query:
+        return jsonify({"jobs": [], "page": page, "next_page": None})
+
+    catalogue_version, catalogue_updated_at = db.session.execute(catalogue_validators()).one()
+    cached = not_modified(["search", catalogue_version, catalogue_updated_at], latest(catalogue_updated_at))
+    if cached is not None:
+        return cached
+
+    # Ask for one extra id to know whether there is another page
+    job_ids = search_job_ids(db.session, query, limit + 1, (page - 1) * limit)
+    has_more = len(job_ids) > limit
+    job_ids = job_ids[:limit]
+
+    jobs_by_id = {
+        job.id: job for job in db.session.execute(select(Job).options(selectinload(Job.skills)).where(Job.id.in_(job_ids))).scalars()
+    }
+
+    return jsonify({
+        "jobs": [job_to_dict(jobs_by_id[job_id]) for job_id in job_ids if job_id in jobs_by_id],
+        "page": page,
+        "next_page": page + 1 if has_more else None,
+    })
+
+
+@app.route("/api/recommendations/status")
+@login_required
+def recommendations_status():
+    task = latest_recommendation_task(current_user.id)
+    if not task:
+        return jsonify({"status": "idle"})
+
+    return jsonify({
+        "status": task.status,
+        "task_id": task.id,
+        "message": task.message,
+        "recommendation_count": task.recommendation_count,
+        "created_at": task.created_at.isoformat(),
+        "finished_at": task.finished_at.isoformat() if task.finished_at else None,
+    })
+
+
+def recommendation_to_dict(rec):
+    return {
+        "id": rec.id,
+        "job": job_to_dict(rec.job),
+        "match_score": rec.match_score,
+        "skill_match_score": rec.skill_match_score,
+        "location_match_score": rec.location_match_score,
+        "experience_match_score": rec.experience_match_score,
+        "match_reasons": json.loads(rec.match_reasons) if rec.match_reasons else {},
+        "missing_skills": json.loads(rec.missing_skills) if rec.missing_skills else {},
+    }
+
+
+def sse_event(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@app.route("/api/recommendations/stream")
+@login_required
+def recommendations_stream():
+    """Server-Sent Events: each recommendation as the worker stores it, then a final "done" event.
+
+    Rows with an id above ?after (or the Last-Event-ID of a reconnect) are sent, together with
+    the ids the user currently has so the page can drop results from the previous run. A stream
+    that is still waiting after RECOMMENDATION_STREAM_MAX_SECONDS ends without "done", and the
+    EventSource reconnects and picks up from the last id.
+    """
+    user_id = current_user.id
+    last_id = request.headers.get("Last-Event-ID", type=int) or request.args.get("after", 0, type=int)
+
+    def events():
+        nonlocal last_id
+        deadline = time.monotonic() + app.config["RECOMMENDATION_STREAM_MAX_SECONDS"]
+        last_sent = time.monotonic()
+        yield "retry: 1000\n\n"
+        while True:
+            task = latest_recommendation_task(user_id)
+            recommendations = db.session.execute(
+                select(JobRecommendation)
+                .options(selectinload(JobRecommendation.job).selectinload(Job.skills))
+                .where(JobRecommendation.user_id == user_id)
+                .order_by(JobRecommendation.id)
+            ).scalars().all()
+            current_ids = [rec.id for rec in recommendations]
+            for rec in recommendations:
+                if rec.id > last_id:
+                    last_id = rec.id
+                    last_sent = time.monotonic()
+                    yield sse_event("recommendation", {**recommendation_to_dict(rec), "current_ids": current_ids}, rec.id)
+
+            if task is None or task.status in ('done', 'failed'):
+                yield sse_event("done", {
+                    "status": task.status if task else "idle",
+                    "message": task.message if task else None,
+                    "recommendation_count": len(current_ids),
+                })
+                return
+
+            if time.monotonic() > deadline:
+                # Free the worker; the browser reconnects after the retry delay
+                return
+
+            if time.monotonic() - last_sent > 15:
+                # Comment line so proxies don't close an idle connection
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+
+            # End the read transaction so the next poll sees the worker's new commits
+            db.session.rollback()
+            db.session.expunge_all()
+            time.sleep(app.config["RECOMMENDATION_STREAM_POLL_INTERVAL"])
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
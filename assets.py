@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip variants are built
+    brotli = None
+
+BUILD_DIR = "dist"
+MANIFEST = "manifest.json"
+# Already-compressed formats gain nothing from gzip or brotli
+COMPRESSIBLE = {".css", ".js", ".webmanifest", ".ico", ".svg", ".json", ".txt"}
+# Hashed names never change content, so browsers may keep them for a year without revalidating
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Checked in order, the first one the client accepts is served
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def source_files(static_folder):
+    for root, dirs, files in os.walk(static_folder):
+        if root == static_folder:
+            dirs[:] = [d for d in dirs if d != BUILD_DIR]
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, static_folder).replace(os.sep, "/"), path
+
+
+def hashed_name(filename, data):
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build_assets(static_folder, clean=False):
+    """Copy every static file to dist/ under a content-hashed name, with gzip and brotli variants.
+
+    Writes dist/manifest.json mapping source names to hashed names and returns the mapping.
+    Files from earlier builds are kept so pages already rendered with old names still load,
+    unless clean is set.
+    """
+    build_dir = os.path.join(static_folder, BUILD_DIR)
+    manifest = {}
+    written = {os.path.join(build_dir, MANIFEST)}
+
+    for filename, path in source_files(static_folder):
+        with open(path, "rb") as f:
+            data = f.read()
+        target = f"{BUILD_DIR}/{hashed_name(filename, data)}"
+        manifest[filename] = target
+
+        target_path = os.path.join(static_folder, target)
+        variants = [(target_path, lambda: data)]
+        if os.path.splitext(filename)[1] in COMPRESSIBLE:
+            variants.append((target_path + ".gz", lambda: gzip.compress(data, compresslevel=9, mtime=0)))
+            if brotli is not None:
+                variants.append((target_path + ".br", lambda: brotli.compress(data, quality=11)))
+
+        for variant_path, compress in variants:
+            written.add(variant_path)
+            # Same name means same content, so an existing file is already up to date
+            if not os.path.exists(variant_path):
+                write_file(variant_path, compress())
+
+    write_file(os.path.join(build_dir, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode())
+
+    if clean:
+        for root, _, files in os.walk(build_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if path not in written:
+                    os.remove(path)
+    return manifest
+
+
+def load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, BUILD_DIR, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def init_assets(app):
+    """Point url_for('static', ...) at the built assets and serve them precompressed and immutable.
+
+    Does nothing until `flask assets build` has written a manifest, and in debug mode, where
+    edited sources have to show up without a rebuild.
+    """
+    manifest = {} if app.debug else load_manifest(app.static_folder)
+    if not manifest:
+        return
+    hashed = set(manifest.values())
+    send_static_file = app.view_functions["static"]
+
+    @app.url_defaults
+    def fingerprint_static_url(endpoint, values):
+        if endpoint == "static" and values.get("filename") in manifest:
+            values["filename"] = manifest[values["filename"]]
+
+    def static(filename):
+        if filename not in hashed:
+            return send_static_file(filename=filename)
+
+        served = filename
+        encoding = None
+        compressible = os.path.splitext(filename)[1] in COMPRESSIBLE
+        if compressible:
+            for name, suffix in ENCODINGS:
+                if request.accept_encodings[name] and os.path.exists(os.path.join(app.static_folder, filename + suffix)):
+                    served, encoding = filename + suffix, name
+                    break
+
+        response = send_from_directory(
+            app.static_folder, served,
+            mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            max_age=IMMUTABLE_MAX_AGE
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if compressible:
+            response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    app.view_functions["static"] = static
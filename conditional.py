@@ -0,0 +1,52 @@
+import hashlib
+import json
+from datetime import timezone
+
+from flask import Response, g, request, session
+
+
+def latest(*timestamps):
+    """The newest of the given timestamps as an aware UTC datetime (naive values are taken as UTC)."""
+    values = [
+        value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+        for value in timestamps if value is not None
+    ]
+    return max(values) if values else None
+
+
+def not_modified(parts, last_modified=None):
+    """Record this response's validators and return a 304 if the client's copy is still current.
+
+    parts is anything JSON-serialisable that changes whenever the response would; call this
+    before the view runs its expensive queries and return the 304 when one comes back.
+    """
+    etag = hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+    g.validators = (etag, last_modified)
+
+    # Pending flash messages are only shown by a full render
+    if session.get("_flashes"):
+        return None
+
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    elif last_modified is not None and request.if_modified_since:
+        fresh = last_modified.replace(microsecond=0) <= request.if_modified_since
+    else:
+        fresh = False
+    return Response(status=304) if fresh else None
+
+
+def init_conditional_get(app):
+    @app.after_request
+    def add_validators(response):
+        validators = g.pop("validators", None)
+        if validators is None or response.status_code not in (200, 304):
+            return response
+
+        etag, last_modified = validators
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        # Per-user responses: the browser may keep a copy but has to revalidate it on every use
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
@@ -0,0 +1,17 @@
+from sqlalchemy import text
+
+
+def explain(session, statement):
+    """Return the database's query plan for a SQLAlchemy statement as a list of lines."""
+    bind = session.get_bind()
+    dialect = bind.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+    if dialect.name == "sqlite":
+        rows = session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        return [row[-1] for row in rows]
+    if dialect.name == "postgresql":
+        rows = session.execute(text(f"EXPLAIN {sql}")).all()
+        return [row[0] for row in rows]
+    rows = session.execute(text(f"EXPLAIN {sql}")).all()
+    return [" | ".join(str(value) for value in row) for row in rows]
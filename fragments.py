@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from cache import TTLCache
+
+
+class FileFragmentStore:
+    """Fragments kept as small files in a directory that every worker process on the host shares."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value):
+        # Write to a temporary file and rename it, so readers never see half a fragment
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+class FragmentCache:
+    """Rendered HTML fragments, each stored with the version it was rendered from.
+
+    Lookups go to an in-process LRU first and then to the optional shared store. A fragment
+    is only returned while its version still matches, so a changed version is a miss even
+    before the old entry has been invalidated.
+    """
+
+    def __init__(self, maxsize=2048, ttl=86400, store=None):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.store = store
+
+    def get(self, key, version):
+        entry = self.local.get(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get(key)
+            if entry is not None:
+                entry = tuple(entry)
+                self.local.set(key, entry)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def set(self, key, version, html):
+        entry = (version, html)
+        self.local.set(key, entry)
+        if self.store is not None:
+            self.store.set(key, entry)
+
+    def invalidate(self, key):
+        self.local.pop(key)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def fetch(self, key, version, render):
+        html = self.get(key, version)
+        if html is None:
+            html = render()
+            self.set(key, version, html)
+        return html
@@ -0,0 +1,38 @@
+import os
+import re
+
+# Threaded workers: the recommendation event stream holds its thread while it waits, not a whole process
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# prometheus_client names its files <type>_<pid>.db, e.g. histogram_1234.db
+_METRICS_FILE = re.compile(r"_(\d+)\.db$")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be added to the new totals. Only the files of
+    # processes that have exited are removed: a recommendation worker on the same host keeps writing.
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for name in os.listdir(multiproc_dir):
+            match = _METRICS_FILE.search(name)
+            if match and not _pid_alive(int(match.group(1))):
+                os.remove(os.path.join(multiproc_dir, name))
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,77 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from werkzeug.security import generate_password_hash
+
+
+def iter_rows(path):
+    """Yield (row_number, dict) for each data row of a CSV or XLSX file without loading it all."""
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else "" for cell in next(rows, [])]
+            for number, values in enumerate(rows, start=2):
+                if not any(value is not None and str(value).strip() for value in values):
+                    continue
+                yield number, {
+                    key: "" if value is None else str(value).strip()
+                    for key, value in zip(header, values) if key
+                }
+        finally:
+            workbook.close()
+
+    elif extension == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            reader = csv.DictReader(file)
+            for number, row in enumerate(reader, start=2):
+                if not any((value or "").strip() for value in row.values()):
+                    continue
+                yield number, {(key or "").strip(): (value or "").strip() for key, value in row.items()}
+
+    else:
+        raise ValueError(f"Unsupported file type: {extension} (expected .csv or .xlsx)")
+
+
+def iter_ndjson(stream, max_line_bytes=65536):
+    """Yield (line_number, object, error) for each non-blank line of an NDJSON stream, one line at a time."""
+    number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        number += 1
+        if len(line) > max_line_bytes and not line.endswith(b"\n"):
+            # Skip the rest of the over-long line without buffering it
+            while (rest := stream.readline(max_line_bytes)) and not rest.endswith(b"\n"):
+                pass
+            yield number, None, f"line is longer than {max_line_bytes} bytes"
+            continue
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield number, None, "expected a JSON object"
+            continue
+        yield number, data, None
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def hash_password(password):
+    # Same scheme as the registration routes
+    return generate_password_hash(password=password, salt_length=8, method="pbkdf2:sha256")
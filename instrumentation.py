@@ -0,0 +1,110 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from flask import g, has_app_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+
+
+def json_lines_logger(name):
+    """Return the named logger set up to print each record's message (one JSON object) on its own line."""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        # Already printed here, don't pass the record on to Flask's "app" logger as well
+        logger.propagate = False
+    return logger
+
+
+logger = json_lines_logger("app.timing")
+
+
+def _timing():
+    # Only requests with timing enabled have g.timing
+    if has_app_context():
+        return g.get("timing")
+    return None
+
+
+@contextmanager
+def timed(metric):
+    """Add the block's duration to the current request's timing under metric (e.g. "llm")."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing = _timing()
+        if timing is not None:
+            timing[f"{metric}_ms"] = timing.get(f"{metric}_ms", 0.0) + (time.perf_counter() - start) * 1000
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start"].pop()
+    timing = _timing()
+    if timing is not None:
+        timing["db_queries"] += 1
+        timing["db_ms"] += (time.perf_counter() - start) * 1000
+
+
+def _before_render(sender, template, context, **extra):
+    timing = _timing()
+    if timing is not None:
+        timing["render_start"] = time.perf_counter()
+
+
+def _after_render(sender, template, context, **extra):
+    timing = _timing()
+    if timing is not None and "render_start" in timing:
+        timing["render_ms"] += (time.perf_counter() - timing.pop("render_start")) * 1000
+
+
+def server_timing_header(timing, total_ms):
+    return ", ".join([
+        f'db;dur={timing["db_ms"]:.1f};desc="{timing["db_queries"]} queries"',
+        f'llm;dur={timing.get("llm_ms", 0.0):.1f}',
+        f'render;dur={timing["render_ms"]:.1f}',
+        f'total;dur={total_ms:.1f}',
+    ])
+
+
+def init_request_timing(app, db):
+    """Record DB, LLM and template time per request and report it in Server-Timing and the log."""
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+    @app.before_request
+    def start_request_timing():
+        g.timing = {"start": time.perf_counter(), "db_queries": 0, "db_ms": 0.0, "render_ms": 0.0}
+
+    @app.after_request
+    def finish_request_timing(response):
+        timing = g.pop("timing", None)
+        if timing is None:
+            return response
+
+        total_ms = (time.perf_counter() - timing["start"]) * 1000
+        response.headers["Server-Timing"] = server_timing_header(timing, total_ms)
+        logger.info(json.dumps({
+            "event": "request",
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+            "duration_ms": round(total_ms, 1),
+            "db_queries": timing["db_queries"],
+            "db_ms": round(timing["db_ms"], 1),
+            "llm_ms": round(timing.get("llm_ms", 0.0), 1),
+            "render_ms": round(timing["render_ms"], 1),
+        }))
+        return response
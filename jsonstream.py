@@ -0,0 +1,65 @@
+import json
+
+
+class ArrayItemParser:
+    """Pick complete objects out of one array of a JSON document while it is still being streamed.
+
+    For {"recommendations": [{...}, {...}]} fed in arbitrary chunks, feed() returns each
+    {...} as soon as its closing brace arrives. Text around the document (code fences,
+    prose) is ignored, and only the current item is buffered.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.stack = []
+        self.in_string = False
+        self.escape = False
+        self.string = []
+        self.last_string = None
+        self.in_array = False
+        self.item = None
+        self.errors = 0
+
+    def feed(self, text):
+        items = []
+        for char in text:
+            if self.item is not None:
+                self.item.append(char)
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if len(self.stack) == 1:
+                        self.last_string = "".join(self.string)
+                elif len(self.stack) == 1:
+                    self.string.append(char)
+                continue
+
+            if not self.stack and char != "{":
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self.string = []
+            elif char in "{[":
+                if char == "[" and self.stack == ["{"] and self.last_string == self.key:
+                    self.in_array = True
+                elif char == "{" and self.in_array and len(self.stack) == 2:
+                    self.item = [char]
+                self.stack.append(char)
+            elif char in "}]":
+                if self.stack:
+                    self.stack.pop()
+                if char == "]" and self.in_array and len(self.stack) == 1:
+                    self.in_array = False
+                elif char == "}" and self.item is not None and len(self.stack) == 2:
+                    try:
+                        items.append(json.loads("".join(self.item)))
+                    except json.JSONDecodeError:
+                        self.errors += 1
+                    self.item = None
+        return items
@@ -0,0 +1,156 @@
+import json
+import os
+import random
+import threading
+import time
+
+import anthropic
+import httpx
+
+from instrumentation import json_lines_logger
+
+logger = json_lines_logger("app.llm")
+
+# Statuses worth another attempt: timeouts, conflicts, rate limits, server errors and "overloaded"
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def _forget_client():
+    # A forked child must not share the parent's sockets; it builds its own client on first use
+    global _client, _client_pid, _lock
+    _client = None
+    _client_pid = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_client)
+
+
+def get_client(config):
+    """Return this process's Anthropic client, creating it on first use."""
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = anthropic.Anthropic(
+                api_key=config.get("ANTHROPIC_API_KEY"),
+                # Retries happen in create_message so the deadline covers every attempt
+                max_retries=0,
+                timeout=httpx.Timeout(config["LLM_TIMEOUT"], connect=config["LLM_CONNECT_TIMEOUT"]),
+                http_client=anthropic.DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=config["LLM_MAX_CONNECTIONS"],
+                        max_keepalive_connections=config["LLM_MAX_CONNECTIONS"],
+                    ),
+                ),
+            )
+            _client_pid = os.getpid()
+    return _client
+
+
+def is_retryable(error):
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    return isinstance(error, anthropic.APIStatusError) and error.status_code in RETRYABLE_STATUS
+
+
+def retry_delay(attempt, error):
+    # Full jitter, unless the API asked for a specific wait
+    retry_after = None
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("retry-after", ""))
+        except ValueError:
+            pass
+    if retry_after is not None and 0 <= retry_after <= RETRY_MAX_DELAY:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+
+def log_call(model, attempt, started, outcome, usage=None):
+    logger.info(json.dumps({
+        "event": "llm_call",
+        "model": model,
+        "attempt": attempt,
+        "outcome": outcome,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "input_tokens": getattr(usage, "input_tokens", None),
+        "output_tokens": getattr(usage, "output_tokens", None),
+        "cache_read_tokens": getattr(usage, "cache_read_input_tokens", None),
+    }))
+
+
+def handle_failure(error, model, attempt, attempts, started, deadline):
+    # Log the failed attempt, then either wait for the next one or re-raise
+    outcome = f"{type(error).__name__}:{getattr(error, 'status_code', '')}".rstrip(":")
+    log_call(model, attempt, started, outcome)
+    delay = retry_delay(attempt, error)
+    if not is_retryable(error) or attempt == attempts or time.monotonic() + delay >= deadline:
+        raise error
+    time.sleep(delay)
+
+
+def attempt_timeout(config, deadline):
+    return httpx.Timeout(min(config["LLM_TIMEOUT"], deadline - time.monotonic()), connect=config["LLM_CONNECT_TIMEOUT"])
+
+
+def create_message(config, **params):
+    """client.messages.create with bounded, jittered retries that all finish within LLM_DEADLINE seconds."""
+    client = get_client(config)
+    deadline = time.monotonic() + config["LLM_DEADLINE"]
+    attempts = config["LLM_MAX_RETRIES"] + 1
+
+    for attempt in range(1, attempts + 1):
+        started = time.perf_counter()
+        try:
+            response = client.messages.create(timeout=attempt_timeout(config, deadline), **params)
+        except anthropic.APIError as e:
+            handle_failure(e, params.get("model"), attempt, attempts, started, deadline)
+            continue
+
+        log_call(params.get("model"), attempt, started, "ok", response.usage)
+        return response
+
+
+def stream_text(config, on_usage=None, **params):
+    """Yield the response text as it is generated, with the same timeouts and deadline as create_message.
+
+    Only failures before the first chunk are retried; once text has been handed to the
+    caller the error is raised.
+    """
+    client = get_client(config)
+    deadline = time.monotonic() + config["LLM_DEADLINE"]
+    attempts = config["LLM_MAX_RETRIES"] + 1
+
+    for attempt in range(1, attempts + 1):
+        started = time.perf_counter()
+        streamed = False
+        try:
+            with client.messages.stream(timeout=attempt_timeout(config, deadline), **params) as stream:
+                for text in stream.text_stream:
+                    streamed = True
+                    yield text
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"LLM response took longer than {config['LLM_DEADLINE']} seconds")
+                response = stream.get_final_message()
+        except anthropic.APIError as e:
+            if streamed:
+                log_call(params.get("model"), attempt, started, f"{type(e).__name__}:stream")
+                raise
+            handle_failure(e, params.get("model"), attempt, attempts, started, deadline)
+            continue
+
+        log_call(params.get("model"), attempt, started, "ok", response.usage)
+        if on_usage is not None:
+            on_usage(response.usage)
+        return
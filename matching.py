@@ -0,0 +1,252 @@
+import re
+from typing import Optional, List, Dict, Iterable
+
+# Weights used for the overall match_score (weighted average)
+SKILL_WEIGHT = 0.5
+LOCATION_WEIGHT = 0.2
+SALARY_WEIGHT = 0.15
+EXPERIENCE_WEIGHT = 0.15
+
+REMOTE_KEYWORDS = {"remote", "anywhere", "worldwide"}
+
+# Years of experience implied by common title keywords when a job doesn't say
+SENIORITY_YEARS = {
+    "intern": 0,
+    "graduate": 0,
+    "trainee": 0,
+    "junior": 1,
+    "entry": 0,
+    "mid": 3,
+    "senior": 5,
+    "lead": 6,
+    "principal": 8,
+    "staff": 7,
+    "head": 8,
+    "director": 10,
+}
+
+_SKILL_SPLIT = re.compile(r"[,;/|\n]+")
+_WORD = re.compile(r"[a-z0-9]+")
+_YEARS = re.compile(r"(\d+)\s*\+?\s*(?:years|yrs)", re.IGNORECASE)
+_AMOUNT = re.compile(r"(\d+(?:[.,]\d+)*)\s*([kKmM]?)")
+
+
+# Common spellings that should count as the same skill
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "react.js": "react",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "golang": "go",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "amazon web services": "aws",
+}
+
+
+def canonical_skill(skill: str) -> str:
+    name = " ".join(skill.lower().split())
+    return SKILL_ALIASES.get(name, name)
+
+
+def split_skills(text: Optional[str]) -> Dict[str, str]:
+    """Map canonical skill names to the first spelling used in text, keeping their order."""
+    skills = {}
+    for raw in _SKILL_SPLIT.split(text or ""):
+        display = " ".join(raw.split())
+        if display:
+            skills.setdefault(canonical_skill(display), display)
+    return skills
+
+
+def parse_skills(text: Optional[str]) -> set:
+    if not text:
+        return set()
+    return {canonical_skill(s) for s in _SKILL_SPLIT.split(text) if s.strip()}
+
+
+def location_tokens(text: Optional[str]) -> set:
+    if not text:
+        return set()
+    return set(_WORD.findall(text.lower()))
+
+
+def parse_salary_range(text: Optional[str]) -> Optional[tuple]:
+    """Parse strings such as "₦200k - ₦250k" or "$50,000" into a (low, high) tuple."""
+    if not text:
+        return None
+
+    amounts = []
+    for number, suffix in _AMOUNT.findall(text):
+        try:
+            value = float(number.replace(",", ""))
+        except ValueError:
+            continue
+        if suffix.lower() == "k":
+            value *= 1_000
+        elif suffix.lower() == "m":
+            value *= 1_000_000
+        amounts.append(value)
+
+    if not amounts:
+        return None
+    return min(amounts), max(amounts)
+
+
+def required_years(title: Optional[str], description: Optional[str]) -> Optional[int]:
+    text = f"{title or ''} {description or ''}"
+    years = _YEARS.search(text)
+    if years:
+        return int(years.group(1))
+
+    for word in _WORD.findall((title or "").lower()):
+        if word in SENIORITY_YEARS:
+            return SENIORITY_YEARS[word]
+    return None
+
+
+class JobFeatures:
+    """Pre-parsed columns for a batch of jobs, so scoring is a single pass per profile.
+
+    skills maps job ids to their canonical skill names (the job_skills rows); without it
+    they are parsed from skills_required.
+    """
+
+    def __init__(self, jobs: Iterable, skills: Optional[Dict[int, set]] = None):
+        self.jobs = list(jobs)
+        self.ids = [job.id for job in self.jobs]
+        if skills is None:
+            self.skills = [parse_skills(job.skills_required) for job in self.jobs]
+        else:
+            self.skills = [skills.get(job.id, set()) for job in self.jobs]
+        self.locations = [location_tokens(job.location) for job in self.jobs]
+        self.remote = [
+            bool(REMOTE_KEYWORDS & (loc | location_tokens(job.job_type)))
+            for job, loc in zip(self.jobs, self.locations)
+        ]
+        self.salaries = [parse_salary_range(job.salary_range) for job in self.jobs]
+        self.years = [required_years(job.title, job.description) for job in self.jobs]
+
+    def __len__(self):
+        return len(self.jobs)
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def skill_scores(user_skills: set, job_skills: List[set]) -> List[float]:
+    return [len(user_skills & required) / len(required) if required else 0.5 for required in job_skills]
+
+
+def location_scores(user_location: set, job_locations: List[set], remote: List[bool]) -> List[float]:
+    scores = []
+    for tokens, is_remote in zip(job_locations, remote):
+        if is_remote:
+            scores.append(1.0)
+        elif not tokens or not user_location:
+            scores.append(0.5)
+        else:
+            scores.append(len(user_location & tokens) / len(tokens))
+    return scores
+
+
+def salary_scores(expected: Optional[tuple], offered: List[Optional[tuple]]) -> List[float]:
+    scores = []
+    for offer in offered:
+        if not expected or not offer:
+            scores.append(0.5)
+        elif offer[1] >= expected[0]:
+            scores.append(1.0)
+        else:
+            scores.append(max(0.0, offer[1] / expected[0]))
+    return scores
+
+
+def experience_scores(user_years: int, job_years: List[Optional[int]]) -> List[float]:
+    scores = []
+    for needed in job_years:
+        if needed is None:
+            scores.append(0.7)
+        elif user_years >= needed:
+            # Heavily over-qualified candidates are a slightly weaker match
+            scores.append(1.0 if user_years - needed <= 5 else 0.8)
+        else:
+            scores.append(max(0.0, 1.0 - (needed - user_years) * 0.25))
+    return scores
+
+
+def build_reasons(user_skills: set, job_skills: set, location: float, salary: float, experience: float) -> Dict:
+    matched = sorted(user_skills & job_skills)
+    reasons = {}
+    if matched:
+        reasons["skills"] = f"Matches {len(matched)} of {len(job_skills)} required skills: {', '.join(matched)}"
+    if location >= 1.0:
+        reasons["location"] = "Location matches or the role is remote"
+    if salary >= 1.0:
+        reasons["salary"] = "Salary range meets your expectation"
+    if experience >= 1.0:
+        reasons["experience"] = "Your experience meets the level for this role"
+    return reasons
+
+
+def score_jobs(profile, jobs, limit: Optional[int] = 5, user_skills: Optional[set] = None) -> List[Dict]:
+    """Score every job for a profile and return the best matches, highest match_score first.
+
+    user_skills is the profile's canonical skill names (the user_skills rows); without it
+    they are parsed from profile.skills. The returned dicts use the same structure as the
+    LLM's "recommendations" list so they can be saved as JobRecommendation rows directly.
+    """
+    features = jobs if isinstance(jobs, JobFeatures) else JobFeatures(jobs)
+    if not len(features):
+        return []
+
+    if user_skills is None:
+        user_skills = parse_skills(profile.skills)
+    skill = skill_scores(user_skills, features.skills)
+    location = location_scores(location_tokens(profile.location), features.locations, features.remote)
+    salary = salary_scores(parse_salary_range(profile.salary_range), features.salaries)
+    experience = experience_scores(_to_int(profile.experience_years), features.years)
+
+    overall = [
+        SKILL_WEIGHT * s + LOCATION_WEIGHT * l + SALARY_WEIGHT * p + EXPERIENCE_WEIGHT * e
+        for s, l, p, e in zip(skill, location, salary, experience)
+    ]
+
+    ranked = sorted(range(len(features)), key=lambda i: (-overall[i], features.ids[i]))
+    if limit is not None:
+        ranked = ranked[:limit]
+
+    recommendations = []
+    for i in ranked:
+        missing = sorted(features.skills[i] - user_skills)
+        recommendations.append({
+            "job_id": features.ids[i],
+            "match_score": round(overall[i], 4),
+            "skill_match_score": round(skill[i], 4),
+            "location_match_score": round(location[i], 4),
+            "salary_match_score": round(salary[i], 4),
+            "experience_match_score": round(experience[i], 4),
+            "match_reasons": build_reasons(user_skills, features.skills[i], location[i], salary[i], experience[i]),
+            "missing_skills": {"required": missing} if missing else {},
+        })
+    return recommendations
+
+
+def shortlist(profile, jobs, k: int, user_skills: Optional[set] = None) -> List:
+    """Return the k jobs that score highest for this profile, best first."""
+    features = jobs if isinstance(jobs, JobFeatures) else JobFeatures(jobs)
+    by_id = {job.id: job for job in features.jobs}
+    return [by_id[rec["job_id"]] for rec in score_jobs(profile, features, limit=k, user_skills=user_skills)]
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text and JSON
+    return len(text) // 4 + 1
@@ -0,0 +1,129 @@
+import atexit
+import os
+import socket
+import threading
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess,
+    push_to_gateway, start_http_server,
+)
+from sqlalchemy import event
+
+# With PROMETHEUS_MULTIPROC_DIR set, every gunicorn worker and recommendation worker writes its samples
+# to that directory and /metrics sums them, so the numbers cover all processes.
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route.", ["endpoint", "method"],
+)
+REQUESTS = Counter(
+    "http_requests_total", "Requests by route and status code.", ["endpoint", "method", "status"],
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Duration of individual SQL statements.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+RECOMMENDATION_LATENCY = Histogram(
+    "recommendation_generation_seconds", "Time to generate a user's recommendations.", ["engine", "outcome"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 60),
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Tokens sent to and received from the LLM.", ["direction"],
+)
+JSON_PARSE_FAILURES = Counter(
+    "recommendation_json_parse_failures_total", "LLM responses that failed a JSON extraction step.", ["method"],
+)
+
+
+def record_llm_usage(usage):
+    if usage is None:
+        return
+    LLM_TOKENS.labels("input").inc(getattr(usage, "input_tokens", 0) or 0)
+    LLM_TOKENS.labels("output").inc(getattr(usage, "output_tokens", 0) or 0)
+    # Prompt caching: prefix tokens written to and served from the provider's cache
+    LLM_TOKENS.labels("cache_write").inc(getattr(usage, "cache_creation_input_tokens", 0) or 0)
+    LLM_TOKENS.labels("cache_read").inc(getattr(usage, "cache_read_input_tokens", 0) or 0)
+
+
+def record_json_parse_failure(method):
+    JSON_PARSE_FAILURES.labels(method).inc()
+
+
+def observe_recommendation(engine, outcome, seconds):
+    RECOMMENDATION_LATENCY.labels(engine, outcome).observe(seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    DB_QUERY_LATENCY.observe(time.perf_counter() - conn.info["metrics_query_start"].pop())
+
+
+def metrics_registry():
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_response():
+    return Response(generate_latest(metrics_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_worker_metrics(port=None, pushgateway=None, push_interval=15):
+    """Expose the recommendation worker's metrics, which no /metrics route serves.
+
+    port starts an HTTP endpoint for Prometheus to scrape. pushgateway pushes to a Pushgateway
+    every push_interval seconds and on exit instead, for hosts where the worker can't be reached.
+    """
+    registry = metrics_registry()
+    if port:
+        start_http_server(port, registry=registry)
+
+    if pushgateway:
+        def push():
+            try:
+                push_to_gateway(pushgateway, job="recommendation_worker", registry=registry,
+                                grouping_key={"instance": socket.gethostname()})
+            except OSError as e:
+                print(f"Error pushing metrics: {e}")
+
+        def push_loop():
+            while True:
+                time.sleep(push_interval)
+                push()
+
+        threading.Thread(target=push_loop, daemon=True).start()
+        atexit.register(push)
+
+
+def init_metrics(app, db):
+    """Collect route and DB metrics and serve them at /metrics in Prometheus text format."""
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_metrics_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.pop("metrics_start", None)
+        if start is not None and request.endpoint != "metrics":
+            endpoint = request.endpoint or "unmatched"
+            REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - start)
+            REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        token = app.config.get("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return Response("Unauthorized", status=401)
+        return metrics_response()
@@ -0,0 +1,35 @@
+"""Add full-text search index on jobs
+
+Revision ID: 5e92b4d0f1a7
+Revises: d71e0b5a8c32
+Create Date: 2026-10-18 13:05:52.817430
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from search import ensure_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '5e92b4d0f1a7'
+down_revision = 'd71e0b5a8c32'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postgres: generated tsvector column + GIN index. SQLite: FTS5 table + sync triggers.
+    ensure_search_index(op.get_bind())
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_jobs_search_vector')
+        op.execute('ALTER TABLE jobs DROP COLUMN IF EXISTS search_vector')
+    elif bind.dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS jobs_fts_insert')
+        op.execute('DROP TRIGGER IF EXISTS jobs_fts_delete')
+        op.execute('DROP TRIGGER IF EXISTS jobs_fts_update')
+        op.execute('DROP TABLE IF EXISTS jobs_fts')
@@ -0,0 +1,37 @@
+"""Limit jobs_fts update trigger to indexed columns
+
+Revision ID: b6e2d94f0c13
+Revises: 7a5e0c3f9b18
+Create Date: 2026-10-19 09:14:27.516380
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from search import ensure_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e2d94f0c13'
+down_revision = '7a5e0c3f9b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite only: recreate the trigger so counter updates no longer rewrite the FTS row
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS jobs_fts_update')
+        ensure_search_index(op.get_bind())
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS jobs_fts_update')
+        op.execute(
+            "CREATE TRIGGER jobs_fts_update AFTER UPDATE ON jobs BEGIN "
+            "INSERT INTO jobs_fts(jobs_fts, rowid, title, company, skills_required, description) "
+            "VALUES ('delete', old.id, old.title, old.company, old.skills_required, old.description); "
+            "INSERT INTO jobs_fts(rowid, title, company, skills_required, description) "
+            "VALUES (new.id, new.title, new.company, new.skills_required, new.description); END"
+        )
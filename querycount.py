@@ -0,0 +1,60 @@
+import functools
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+
+@contextmanager
+def count_queries(engine):
+    """Count the SQL statements this thread sends through engine while the block runs."""
+    counter = QueryCounter()
+    thread_id = threading.get_ident()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread_id:
+            counter.count += 1
+            counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def query_budget(engine, max_queries, name="block"):
+    """Fail with QueryBudgetExceeded when the block issues more than max_queries statements."""
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > max_queries:
+        statements = "\n".join(f"  {statement}" for statement in counter.statements)
+        raise QueryBudgetExceeded(
+            f"{name} ran {counter.count} queries, budget is {max_queries}:\n{statements}"
+        )
+
+
+def route_query_budget(app, db, max_queries):
+    """Decorator declaring a view's query budget, enforced when QUERY_BUDGET_ENFORCE is on."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not app.config.get("QUERY_BUDGET_ENFORCE"):
+                return view(*args, **kwargs)
+            with query_budget(db.engine, max_queries, name=view.__name__):
+                # Render inside the budget so lazy loads from the template are counted too
+                response = app.make_response(view(*args, **kwargs))
+            return response
+        return wrapper
+    return decorator
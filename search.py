@@ -0,0 +1,104 @@
+import re
+
+from sqlalchemy import text
+
+# Column weights: title matters most, then company and skills, then the description
+POSTGRES_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(company, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(skills_required, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+POSTGRES_DDL = [
+    f"ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({POSTGRES_SEARCH_VECTOR}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+]
+
+# External-content FTS5 table kept in sync with jobs by triggers
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+    "title, company, skills_required, description, content='jobs', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN "
+    "INSERT INTO jobs_fts(rowid, title, company, skills_required, description) "
+    "VALUES (new.id, new.title, new.company, new.skills_required, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN "
+    "INSERT INTO jobs_fts(jobs_fts, rowid, title, company, skills_required, description) "
+    "VALUES ('delete', old.id, old.title, old.company, old.skills_required, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, skills_required, description ON jobs BEGIN "
+    "INSERT INTO jobs_fts(jobs_fts, rowid, title, company, skills_required, description) "
+    "VALUES ('delete', old.id, old.title, old.company, old.skills_required, old.description); "
+    "INSERT INTO jobs_fts(rowid, title, company, skills_required, description) "
+    "VALUES (new.id, new.title, new.company, new.skills_required, new.description); END",
+]
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def ensure_search_index(connection):
+    """Create the full-text index for the current database if it doesn't exist yet."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.execute(text(statement))
+    elif dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'")
+        ).scalar()
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            # Index the jobs that were created before the table existed
+            connection.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+
+
+def fts5_query(query):
+    # Quote every term so user input can't use FTS5 syntax, and prefix-match the last one
+    terms = _TERM.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_job_ids(session, query, limit, offset=0):
+    """Return job ids matching query, best match first."""
+    dialect = session.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        rows = session.execute(
+            text(
+                "SELECT id FROM jobs, websearch_to_tsquery('english', :query) AS q "
+                "WHERE search_vector @@ q "
+                "ORDER BY ts_rank_cd(search_vector, q) DESC, created_at DESC, id DESC "
+                "LIMIT :limit OFFSET :offset"
+            ),
+            {"query": query, "limit": limit, "offset": offset},
+        )
+    elif dialect == "sqlite":
+        match = fts5_query(query)
+        if match is None:
+            return []
+        rows = session.execute(
+            text(
+                "SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH :match "
+                "ORDER BY bm25(jobs_fts, 10.0, 5.0, 5.0, 1.0), rowid DESC "
+                "LIMIT :limit OFFSET :offset"
+            ),
+            {"match": match, "limit": limit, "offset": offset},
+        )
+    else:
+        # No text index available, fall back to a substring scan
+        pattern = f"%{query.lower()}%"
+        rows = session.execute(
+            text(
+                "SELECT id FROM jobs WHERE lower(title) LIKE :pattern OR lower(company) LIKE :pattern "
+                "OR lower(skills_required) LIKE :pattern OR lower(description) LIKE :pattern "
+                "ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset"
+            ),
+            {"pattern": pattern, "limit": limit, "offset": offset},
+        )
+
+    return [row[0] for row in rows]
@@ -0,0 +1,75 @@
+import os
+import tempfile
+
+import pytest
+
+# app.py reads its configuration from the environment at import time
+_db_dir = tempfile.mkdtemp()
+os.environ["DB_URI"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ["RECOMMENDATION_INLINE_WORKER"] = "false"
+
+from werkzeug.security import generate_password_hash
+
+import app as app_module
+from search import ensure_search_index
+
+PASSWORD = "password"
+
+
+@pytest.fixture()
+def app():
+    flask_app = app_module.app
+    flask_app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with flask_app.app_context():
+        app_module.db.create_all()
+        with app_module.db.engine.begin() as connection:
+            ensure_search_index(connection)
+    yield flask_app
+    with flask_app.app_context():
+        app_module.db.session.remove()
+        app_module.db.drop_all()
+        with app_module.db.engine.begin() as connection:
+            connection.exec_driver_sql("DROP TABLE IF EXISTS jobs_fts")
+    app_module.identity_cache.clear()
+    app_module.fragment_cache.local.clear()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+def login(client, email):
+    return client.post("/login", data={"email": email, "password": PASSWORD})
+
+
+def make_user(email, role, full_name="Test User", **profile):
+    db = app_module.db
+    user = app_module.User(email=email, password=generate_password_hash(PASSWORD), phone="0800",
+                           role=role, verified=True)
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(app_module.UserProfile(user_id=user.id, role=role, full_name=full_name, location="Lagos",
+                                          bio="", **profile))
+    # Same skill links as profile completion writes
+    user.skills = app_module.get_or_create_skills(profile.get("skills"))
+    return user
+
+
+JOB = {
+    "company": "Acme", "location": "Lagos", "job_type": "Remote", "salary_range": "100k",
+    "description": "Build things", "skills_required": "Python, SQL", "requirements": "3 years",
+}
+
+
+@pytest.fixture()
+def catalogue(app):
+    # A company with three jobs and one job seeker
+    with app.app_context():
+        company = make_user("company@example.com", "company", company_name="Acme")
+        seeker = make_user("seeker@example.com", "job_seeker", company_name="", skills="Python", experience_years=3)
+        app_module.db.session.flush()
+        job_ids = app_module.insert_jobs([{**JOB, "employer_id": company.id, "title": f"Engineer {i}"} for i in range(3)])
+        app_module.db.session.commit()
+        return {"company_id": company.id, "seeker_id": seeker.id, "job_ids": job_ids}
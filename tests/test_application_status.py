@@ -0,0 +1,33 @@
+from sqlalchemy import update
+
+import app as app_module
+
+
+def counters(job_id):
+    job = app_module.db.session.get(app_module.Job, job_id)
+    app_module.db.session.refresh(job)
+    return job.application_count, job.under_review_count, job.accepted_count, job.rejected_count
+
+
+def test_concurrent_status_changes_keep_counters_exact(app, catalogue):
+    job_id = catalogue["job_ids"][0]
+    db = app_module.db
+    with app.app_context():
+        application = app_module.Application(user_id=catalogue["seeker_id"], job_id=job_id, match_score=0.5)
+        db.session.add(application)
+        app_module.adjust_job_counters(job_id, application.status)
+        db.session.commit()
+        assert application.status == "Under Review"
+
+        # Another reviewer accepts it after this request loaded the application
+        with db.engine.begin() as connection:
+            connection.execute(update(app_module.Application.__table__).values(status="Accepted"))
+            connection.execute(update(app_module.Job.__table__).where(app_module.Job.__table__.c.id == job_id)
+                               .values(under_review_count=0, accepted_count=1))
+
+        app_module.change_application_status(application, "Rejected")
+        db.session.commit()
+
+        assert application.status == "Rejected"
+        assert counters(job_id) == (1, 0, 0, 1)
+        assert app_module.reconcile_job_counters() == 0
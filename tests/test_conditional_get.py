@@ -0,0 +1,36 @@
+import app as app_module
+from conftest import login
+
+
+def test_job_edit_changes_dashboard_etag(app, client, catalogue):
+    job_id = catalogue["job_ids"][0]
+    login(client, "seeker@example.com")
+    etag = client.get("/job-seeker-dashboard").headers["ETag"]
+    assert client.get("/job-seeker-dashboard", headers={"If-None-Match": etag}).status_code == 304
+
+    with app.app_context():
+        app_module.adjust_job_counters(job_id)
+        app_module.db.session.commit()
+    # Counters aren't shown on the page
+    assert client.get("/job-seeker-dashboard", headers={"If-None-Match": etag}).status_code == 304
+
+    with app.app_context():
+        app_module.db.session.get(app_module.Job, job_id).title = "Staff Engineer"
+        app_module.db.session.commit()
+    response = client.get("/job-seeker-dashboard", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert b"Staff Engineer" in response.data
+
+
+def test_company_dashboard_shows_no_relative_times(app, client, catalogue):
+    # A 304 hours later would keep showing "5 minutes ago"
+    with app.app_context():
+        app_module.db.session.add(app_module.Application(user_id=catalogue["seeker_id"], job_id=catalogue["job_ids"][0],
+                                                         match_score=0.5))
+        app_module.db.session.commit()
+
+    login(client, "company@example.com")
+    response = client.get("/company-dashboard")
+    assert response.status_code == 200
+    assert b"Applied" in response.data
+    assert b" ago" not in response.data
@@ -0,0 +1,38 @@
+import csv
+import io
+from datetime import datetime
+
+import openpyxl
+
+from exporter import iter_csv, iter_xlsx
+
+HEADER = ["Name", "Score", "Applied At", "Note"]
+BATCHES = [
+    [["Ada Lovelace", 0.9, datetime(2026, 1, 2, 3, 4, 5), "=HYPERLINK(\"x\")"]],
+    [],
+    [["<Grace> & \"Hopper\"", 3, None, "bell\x07 ok"], ["Alan Turing", True, None, "-1"]],
+]
+
+
+def test_xlsx_opens_with_every_row():
+    chunks = list(iter_xlsx(HEADER, iter(BATCHES), sheet_name="Applications"))
+    # Header, one chunk per batch and the zip trailer
+    assert len(chunks) == len(BATCHES) + 2
+
+    workbook = openpyxl.load_workbook(io.BytesIO(b"".join(chunks)))
+    sheet = workbook["Applications"]
+    assert list(sheet.iter_rows(values_only=True)) == [
+        ("Name", "Score", "Applied At", "Note"),
+        ("Ada Lovelace", 0.9, "2026-01-02 03:04:05", "=HYPERLINK(\"x\")"),
+        ("<Grace> & \"Hopper\"", 3, "", "bell ok"),
+        ("Alan Turing", "True", "", "-1"),
+    ]
+
+
+def test_csv_has_a_bom_and_escapes_formulas():
+    text = "".join(iter_csv(HEADER, iter(BATCHES)))
+    assert text.startswith("\ufeff")
+
+    rows = list(csv.reader(io.StringIO(text[1:])))
+    assert rows[1] == ["Ada Lovelace", "0.9", "2026-01-02 03:04:05", "'=HYPERLINK(\"x\")"]
+    assert rows[3] == ["Alan Turing", "True", "", "'-1"]
@@ -0,0 +1,17 @@
+import app as app_module
+from conftest import make_user
+
+
+def test_only_settled_accounts_are_cached(app):
+    with app.app_context():
+        user = app_module.User(email="new@example.com", password="x", phone="0800", role="job_seeker", verified=False)
+        app_module.db.session.add(user)
+        seeker = make_user("seeker@example.com", "job_seeker", company_name="", skills="Python")
+        app_module.db.session.commit()
+
+        # Other workers would keep the unfinished account after profile completion clears only one cache
+        app_module.load_user(user.id)
+        assert user.id not in app_module.identity_cache
+
+        app_module.load_user(seeker.id)
+        assert seeker.id in app_module.identity_cache
@@ -0,0 +1,20 @@
+import app as app_module
+
+
+def test_bad_experience_years_is_reported_per_row(app, tmp_path):
+    path = tmp_path / "candidates.csv"
+    path.write_text(
+        "email,password,full_name,location,experience_years\n"
+        "ada@example.com,secret,Ada Lovelace,Lagos,3\n"
+        "inf@example.com,secret,Infinite Years,Lagos,inf\n"
+        "big@example.com,secret,Big Number,Lagos,1e400\n"
+        "text@example.com,secret,Some Text,Lagos,three\n"
+    )
+
+    result = app.test_cli_runner().invoke(args=["import", "candidates", str(path), "--processes", "1"])
+
+    assert result.exception is None, result.output
+    assert result.output.count("invalid experience_years") == 3
+    with app.app_context():
+        emails = app_module.db.session.execute(app_module.select(app_module.User.email)).scalars().all()
+    assert emails == ["ada@example.com"]
@@ -0,0 +1,36 @@
+import io
+
+from importer import iter_ndjson
+
+
+def test_ndjson_lines_are_reported_by_line_number():
+    stream = io.BytesIO(b'{"title": "A"}\n\n[1, 2]\n{"title": \n{"title": "B"}')
+
+    results = list(iter_ndjson(stream))
+
+    assert [(number, data) for number, data, _ in results] == [
+        (1, {"title": "A"}), (3, None), (4, None), (5, {"title": "B"}),
+    ]
+    assert results[1][2] == "expected a JSON object"
+    assert results[2][2].startswith("invalid JSON")
+
+
+def test_over_long_lines_are_skipped_without_losing_the_next_line():
+    long_object = b'{"title": "' + b"x" * 100 + b'"}'
+    stream = io.BytesIO(long_object + b'\n{"title": "B"}\n' + long_object)
+
+    assert list(iter_ndjson(stream, max_line_bytes=32)) == [
+        (1, None, "line is longer than 32 bytes"),
+        (2, {"title": "B"}, None),
+        (3, None, "line is longer than 32 bytes"),
+    ]
+
+
+def test_a_line_of_exactly_the_limit_is_accepted():
+    line = b'{"title": "' + b"x" * 19 + b'"}'
+    assert len(line) == 32
+
+    assert list(iter_ndjson(io.BytesIO(line + b"\n" + line), max_line_bytes=32)) == [
+        (1, {"title": "x" * 19}, None),
+        (2, {"title": "x" * 19}, None),
+    ]
@@ -0,0 +1,38 @@
+from jsonstream import ArrayItemParser
+
+DOCUMENT = (
+    'Here are your matches:\n```json\n'
+    '{"summary": "Two {good} [matches]", "recommendations": ['
+    '{"job_id": 1, "reasons": ["Python", "says \\"hi\\" }"], "extra": {"nested": [1, 2]}},'
+    '{"job_id": 2, "match_score": 0.5}'
+    '], "other": [{"job_id": 3}]}\n```\nGood luck!'
+)
+EXPECTED = [
+    {"job_id": 1, "reasons": ["Python", 'says "hi" }'], "extra": {"nested": [1, 2]}},
+    {"job_id": 2, "match_score": 0.5},
+]
+
+
+def parse(chunks):
+    parser = ArrayItemParser("recommendations")
+    items = [item for chunk in chunks for item in parser.feed(chunk)]
+    return items, parser.errors
+
+
+def test_items_are_the_same_however_the_document_is_chunked():
+    assert parse([DOCUMENT]) == (EXPECTED, 0)
+    assert parse(DOCUMENT) == (EXPECTED, 0)
+    assert parse(DOCUMENT[i:i + 7] for i in range(0, len(DOCUMENT), 7)) == (EXPECTED, 0)
+
+
+def test_each_item_is_returned_once_its_closing_brace_arrives():
+    parser = ArrayItemParser("recommendations")
+    assert parser.feed('{"recommendations": [{"job_id": 1}, {"job_') == [{"job_id": 1}]
+    assert parser.feed('id": 2}') == [{"job_id": 2}]
+    assert parser.feed("]}") == []
+
+
+def test_malformed_items_are_counted_and_skipped():
+    items, errors = parse(['{"recommendations": [{"job_id": 1,}, {"job_id": 2}]}'])
+    assert items == [{"job_id": 2}]
+    assert errors == 1
@@ -0,0 +1,35 @@
+import app as app_module
+
+
+def finished_task(user_id, profile, engine):
+    return app_module.RecommendationTask(
+        user_id=user_id, status="done", recommendation_count=1,
+        cache_key=app_module.recommendation_cache_key(profile, engine=engine,
+                                                      catalogue_version=app_module.current_catalogue_version()),
+    )
+
+
+def test_users_are_matched_on_their_own_cache_key(app, catalogue):
+    with app.app_context():
+        company = app_module.db.session.get(app_module.User, catalogue["company_id"]).profile
+        seeker = app_module.db.session.get(app_module.User, catalogue["seeker_id"]).profile
+        # The company's run says nothing about the seeker, even for an identical profile
+        app_module.db.session.add(finished_task(company.user_id, seeker, "local"))
+        app_module.db.session.commit()
+
+        version = app_module.current_catalogue_version()
+        assert app_module.up_to_date_user_ids([seeker], version) == set()
+
+
+def test_current_llm_recommendations_count_as_up_to_date(app, catalogue, monkeypatch):
+    monkeypatch.setitem(app.config, "RECOMMENDATION_ENGINE", "llm")
+    with app.app_context():
+        seeker = app_module.db.session.get(app_module.User, catalogue["seeker_id"]).profile
+        app_module.db.session.add(finished_task(seeker.user_id, seeker, "llm"))
+        app_module.db.session.commit()
+
+        version = app_module.current_catalogue_version()
+        assert app_module.up_to_date_user_ids([seeker], version) == {seeker.user_id}
+
+        computed, skipped = app_module.precompute_recommendations(version, batch_size=10)
+        assert (computed, skipped) == (0, 1)
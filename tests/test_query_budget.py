@@ -0,0 +1,62 @@
+import pytest
+
+import app as app_module
+from conftest import login, make_user
+from querycount import QueryBudgetExceeded, query_budget
+
+
+@pytest.fixture()
+def populated(app):
+    # Enough rows per relationship that an N+1 in a view or template would blow its budget
+    db = app_module.db
+    with app.app_context():
+        company = make_user("company@example.com", "company", company_name="Acme")
+        seekers = [
+            make_user(f"seeker{i}@example.com", "job_seeker", company_name="", skills="Python, SQL", experience_years=3)
+            for i in range(3)
+        ]
+        db.session.flush()
+
+        jobs = app_module.insert_jobs([
+            {
+                "employer_id": company.id, "company": "Acme", "title": f"Engineer {i}", "location": "Lagos",
+                "job_type": "Remote", "salary_range": "100k", "description": "Build things",
+                "skills_required": "Python, SQL, Docker", "requirements": "3 years",
+            }
+            for i in range(8)
+        ])
+        for seeker in seekers:
+            for job_id in jobs[:5]:
+                db.session.add(app_module.Application(user_id=seeker.id, job_id=job_id, match_score=0.5))
+                app_module.adjust_job_counters(job_id)
+                db.session.add(app_module.JobRecommendation(user_id=seeker.id, job_id=job_id, match_score=0.7,
+                                                            match_reasons='{"skills": "Python"}',
+                                                            missing_skills='{}'))
+        db.session.commit()
+
+
+@pytest.fixture()
+def enforce_budgets(app):
+    app.config["QUERY_BUDGET_ENFORCE"] = True
+    yield
+    app.config["QUERY_BUDGET_ENFORCE"] = False
+
+
+@pytest.mark.parametrize("email, path", [
+    ("company@example.com", "/company-dashboard"),
+    ("seeker0@example.com", "/job-seeker-dashboard"),
+])
+def test_dashboards_stay_within_query_budget(client, populated, enforce_budgets, email, path):
+    login(client, email)
+    # Twice: the first request loads the identity from the database, the second from the cache
+    for _ in range(2):
+        response = client.get(path)
+        assert response.status_code == 200
+
+
+def test_query_budget_fails_when_exceeded(app, populated):
+    with app.app_context():
+        with pytest.raises(QueryBudgetExceeded):
+            with query_budget(app_module.db.engine, 1, name="two queries"):
+                app_module.db.session.execute(app_module.select(app_module.Job.id)).all()
+                app_module.db.session.execute(app_module.select(app_module.User.id)).all()
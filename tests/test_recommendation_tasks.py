@@ -0,0 +1,28 @@
+import app as app_module
+
+
+def test_only_validated_recommendations_are_cached(app, catalogue, monkeypatch):
+    job_ids = catalogue["job_ids"]
+
+    def engine(user, jobs, on_recommendation):
+        recommendations = [
+            {"job_id": job_ids[0], "match_score": 0.9},
+            {"job_id": job_ids[0], "match_score": 0.8},  # duplicate
+            {"job_id": 9999, "match_score": 0.7},  # not a candidate
+            {"job_id": job_ids[1], "match_score": 0.6},
+        ]
+        for rec in recommendations:
+            on_recommendation(rec)
+        return {"recommendations": recommendations}
+
+    monkeypatch.setitem(app_module.RECOMMENDATION_ENGINES, "test", engine)
+    monkeypatch.setitem(app.config, "RECOMMENDATION_ENGINE", "test")
+    app_module.recommendation_cache.clear()
+
+    with app.app_context():
+        profile = app_module.db.session.get(app_module.User, catalogue["seeker_id"]).profile
+        task = app_module.enqueue_recommendation_task(profile)
+        app_module.process_recommendation_task(app_module.db.session.get(app_module.RecommendationTask, task.id))
+        cached = app_module.recommendation_cache.get(task.cache_key)
+
+    assert [rec["job_id"] for rec in cached["recommendations"]] == job_ids[:2]
@@ -0,0 +1,27 @@
+import pytest
+
+import app as app_module
+
+
+def test_late_committed_jobs_are_still_claimed(app, catalogue):
+    job_ids = catalogue["job_ids"]
+    with app.app_context():
+        assert app_module.claim_new_jobs(limit=10) == job_ids
+        assert app_module.claim_new_jobs(limit=10) == []
+
+        # A job with a lower id than the ones already rescored, as when its transaction commits last
+        app_module.db.session.get(app_module.Job, job_ids[0]).rescored = False
+        app_module.db.session.commit()
+
+        assert app_module.claim_new_jobs(limit=10) == [job_ids[0]]
+
+
+def test_jobs_are_handed_back_when_rescoring_fails(app, catalogue, monkeypatch):
+    def fail(job_ids):
+        raise RuntimeError("scoring failed")
+
+    monkeypatch.setattr(app_module, "rescore_jobs", fail)
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            app_module.rescore_new_jobs()
+        assert app_module.claim_new_jobs(limit=10) == catalogue["job_ids"]
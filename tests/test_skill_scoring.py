@@ -0,0 +1,43 @@
+import app as app_module
+from conftest import JOB
+
+
+def link_skills(user_id, text):
+    # Only the join table changes, the profile's skill string still says "Python"
+    user = app_module.db.session.get(app_module.User, user_id)
+    user.skills = app_module.get_or_create_skills(text)
+    app_module.db.session.commit()
+    return user.profile
+
+
+def test_local_scores_use_the_skill_tables(app, catalogue):
+    with app.app_context():
+        profile = app_module.db.session.get(app_module.User, catalogue["seeker_id"]).profile
+        jobs = app_module.db.session.execute(app_module.select(app_module.Job)).scalars().all()
+        before = app_module.local_recommendations(profile, jobs)["recommendations"]
+        assert {rec["skill_match_score"] for rec in before} == {0.5}
+        assert before[0]["missing_skills"] == {"required": ["sql"]}
+
+        profile = link_skills(catalogue["seeker_id"], "Python, SQL")
+        after = app_module.local_recommendations(profile, jobs)["recommendations"]
+        assert {rec["skill_match_score"] for rec in after} == {1.0}
+        assert after[0]["missing_skills"] == {}
+
+
+def test_precomputed_and_rescored_scores_use_the_skill_tables(app, catalogue):
+    with app.app_context():
+        link_skills(catalogue["seeker_id"], "Python, SQL")
+        version, jobs = app_module.precompute_catalogue()
+        app_module.init_precompute_worker(jobs)
+        assert app_module.precompute_recommendations(version, batch_size=10, force=True) == (1, 0)
+
+        new_job_ids = app_module.insert_jobs([{**JOB, "employer_id": catalogue["company_id"], "title": "Engineer 3"}])
+        app_module.db.session.commit()
+        app_module.rescore_new_jobs()
+
+        scores = app_module.db.session.execute(
+            app_module.select(app_module.JobRecommendation.job_id, app_module.JobRecommendation.skill_match_score)
+            .where(app_module.JobRecommendation.user_id == catalogue["seeker_id"])
+        ).all()
+    assert {job_id for job_id, _ in scores} >= set(new_job_ids)
+    assert {score for _, score in scores} == {1.0}